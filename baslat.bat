@@ -30,10 +30,10 @@ if not exist "node_modules\" (
 
 :: 4. Python Bagimliliklari Kontrolu
 echo [BILGI] Python kütüphaneleri kontrol ediliyor...
-python -c "import undetected_chromedriver; import selenium" >nul 2>nul
+python -c "import undetected_chromedriver; import selenium; import lxml; import cssselect; import numpy; import websockets" >nul 2>nul
 if %ERRORLEVEL% neq 0 (
     echo [BILGI] Gerekli Python kütüphaneleri yukleniyor...
-    pip install undetected-chromedriver selenium
+    pip install undetected-chromedriver selenium lxml cssselect numpy websockets
 )
 
 :: 5. Sunuculari Baslat
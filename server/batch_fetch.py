@@ -0,0 +1,68 @@
+import time
+import threading
+
+# Added to every URL fetched through batch_fetch, so the CDP capture can ignore responses
+# that already came back to Python directly
+BATCH_MARKER = "_lbm=1"
+
+# Runs inside the page: a few workers drain the URL list, every body is returned in one callback
+BATCH_FETCH_JS = """
+var urls = arguments[0], limit = arguments[1], done = arguments[arguments.length - 1];
+var out = new Array(urls.length), next = 0;
+function worker() {
+    if (next >= urls.length) return Promise.resolve();
+    var i = next++;
+    return fetch(urls[i], {credentials: 'include'})
+        .then(function (r) { return r.text().then(function (t) { out[i] = {url: urls[i], status: r.status, body: t}; }); })
+        .catch(function (e) { out[i] = {url: urls[i], status: 0, body: null, error: String(e)}; })
+        .then(worker);
+}
+var workers = [];
+for (var w = 0; w < Math.min(limit, urls.length); w++) workers.push(worker());
+Promise.all(workers).then(function () { done(out); });
+"""
+
+
+class TokenBucket:
+    # rate tokens per second, at most burst saved up
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, wanted, minimum=1):
+        # Blocks until `minimum` tokens are available (capped by wanted/burst), then takes up to `wanted`
+        minimum = max(1, min(minimum, wanted, int(self.burst)))
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= minimum:
+                    granted = int(min(wanted, self.tokens))
+                    self.tokens -= granted
+                    return granted
+                wait = (minimum - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def with_marker(url):
+    return f"{url}{'&' if '?' in url else '?'}{BATCH_MARKER}"
+
+def batch_fetch(driver, urls, bucket, concurrency=4):
+    # [{"url", "status", "body"}] in input order (url without the marker); status 0 = network error
+    results = []
+    pending = list(urls)
+    while pending:
+        # Wait for enough tokens to keep every in-page worker busy rather than one script call per token
+        n = bucket.take(len(pending), minimum=concurrency)
+        chunk, pending = pending[:n], pending[n:]
+        out = driver.execute_async_script(BATCH_FETCH_JS, [with_marker(u) for u in chunk], concurrency) or []
+        for url, r in zip(chunk, out):
+            results.append(dict(r or {"status": 0, "body": None}, url=url))
+    return results
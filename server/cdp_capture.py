@@ -0,0 +1,147 @@
+import re
+import json
+import asyncio
+import threading
+import logging
+import urllib.request
+import websockets
+
+logger = logging.getLogger(__name__)
+
+# Event-driven replacement for polling driver.get_log('performance'): a second CDP client on the
+# page target receives Network events as Chrome emits them. Raw frames are filtered as text, so
+# the image/chrome:// noise is never json-decoded, and bodies are fetched concurrently once a
+# response has finished loading.
+
+REQUEST_ID = re.compile(r'"requestId"\s*:\s*"([^"]+)"')
+
+
+def debugger_address(driver):
+    options = getattr(driver, "options", None)
+    if options is not None and getattr(options, "debugger_address", None):
+        return options.debugger_address
+    return driver.capabilities.get("goog:chromeOptions", {}).get("debuggerAddress")
+
+
+class CdpCapture:
+    def __init__(self, address, url_filter, on_response, max_body_fetches=8):
+        # url_filter(url) -> bool, cheap check on the response url
+        # on_response(url, body) runs on a worker thread for every finished response that passed the filter
+        self.address = address
+        self.url_filter = url_filter
+        self.on_response = on_response
+        self.max_body_fetches = max_body_fetches
+        self.loop = None
+        self.thread = None
+        self.error = None
+        self._connected = threading.Event()
+        self._stop = None
+        self._tasks = set()     # in-flight body fetches; the loop itself only keeps weak references
+
+    def start(self, timeout=15):
+        self.thread = threading.Thread(target=self._run, name="cdp-capture", daemon=True)
+        self.thread.start()
+        if not self._connected.wait(timeout):
+            raise RuntimeError(f"CDP capture could not attach to {self.address}: {self.error}")
+
+    def alive(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def stop(self):
+        if self.loop and self._stop:
+            self.loop.call_soon_threadsafe(self._stop.set)
+        if self.thread:
+            self.thread.join(timeout=5)
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self._main())
+        except Exception as e:
+            self.error = e
+            logger.error(f"CDP capture stopped: {e}")
+        finally:
+            self.loop.close()
+
+    def _page_ws_url(self):
+        with urllib.request.urlopen(f"http://{self.address}/json", timeout=5) as r:
+            targets = json.loads(r.read())
+        for t in targets:
+            if t.get("type") == "page" and t.get("webSocketDebuggerUrl"):
+                return t["webSocketDebuggerUrl"]
+        raise RuntimeError("no page target")
+
+    async def _main(self):
+        self._stop = asyncio.Event()
+        ws_url = await self.loop.run_in_executor(None, self._page_ws_url)
+        async with websockets.connect(ws_url, max_size=None, ping_interval=None) as ws:
+            self.ws = ws
+            self.next_id = 0
+            self.replies = {}                 # command id -> future
+            self.pending = {}                 # requestId -> url, responses we want the body of
+            self.body_slots = asyncio.Semaphore(self.max_body_fetches)
+            reader = asyncio.ensure_future(self._read())
+            await self._send("Network.enable", {"maxPostDataSize": 0})
+            self._connected.set()
+            logger.info(f"CDP capture attached to {ws_url}")
+            stopper = asyncio.ensure_future(self._stop.wait())
+            done, _ = await asyncio.wait([reader, stopper], return_when=asyncio.FIRST_COMPLETED)
+            reader.cancel()
+            stopper.cancel()
+            if reader in done and reader.exception():
+                raise reader.exception()
+
+    def _spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _send(self, method, params=None):
+        self.next_id += 1
+        future = self.loop.create_future()
+        self.replies[self.next_id] = future
+        await self.ws.send(json.dumps({"id": self.next_id, "method": method, "params": params or {}}))
+        return await future
+
+    async def _read(self):
+        async for raw in self.ws:
+            msg = None
+            if '"id"' in raw:
+                # Replies to our commands carry an id and no method, whatever order Chrome writes the keys in
+                msg = json.loads(raw)
+                if "id" in msg and "method" not in msg:
+                    future = self.replies.pop(msg["id"], None)
+                    if future and not future.done():
+                        future.set_result(msg)
+                    continue
+            if '"Network.responseReceived"' in raw:
+                if "api/v1" not in raw:
+                    continue
+                params = (msg or json.loads(raw)).get("params", {})
+                url = params.get("response", {}).get("url", "")
+                if self.url_filter(url):
+                    self.pending[params["requestId"]] = url
+            elif self.pending and ('"Network.loadingFinished"' in raw or '"Network.loadingFailed"' in raw):
+                m = REQUEST_ID.search(raw)
+                url = self.pending.pop(m.group(1), None) if m else None
+                if url and '"Network.loadingFinished"' in raw:
+                    self._spawn(self._fetch_body(m.group(1), url))
+
+    async def _fetch_body(self, request_id, url):
+        async with self.body_slots:
+            try:
+                reply = await asyncio.wait_for(self._send("Network.getResponseBody", {"requestId": request_id}), 10)
+            except asyncio.TimeoutError:
+                logger.warning(f"CDP body timeout for {url}")
+                return
+        body = reply.get("result", {}).get("body", "")
+        if body:
+            # File writes / parsing stay off the event loop
+            self.loop.run_in_executor(None, self._deliver, url, body)
+
+    def _deliver(self, url, body):
+        try:
+            self.on_response(url, body)
+        except Exception as e:
+            logger.error(f"Capture handler failed for {url}: {e}")
@@ -0,0 +1,184 @@
+import os
+import sys
+import json
+import time
+import random
+import signal
+import argparse
+import threading
+from datetime import datetime
+from consensus_scraper import MAX_WORKERS, SCRAPE_ORDER, SITE_NAMES, ConsensusScraper
+
+try:
+    import fcntl
+except ImportError:   # Windows (baslat.bat)
+    fcntl = None
+    import msvcrt
+
+# Resident scheduler for the consensus sources, started once by proxy.js.
+# Imports, the SQLite stores and warm browsers are kept between runs instead of being
+# rebuilt by a fresh consensus_scraper.py process every few hours.
+
+LOCK_FILE = "server/consensus_daemon.lock"
+STATUS_FILE = "server/consensus_status.json"
+
+# Seconds between runs per site; sources whose tips move during the day are polled more often
+DEFAULT_CADENCE = int(os.environ.get("CONSENSUS_INTERVAL", str(4 * 3600)))
+SITE_CADENCE = {
+    "olbg": 3600,          # tip counts keep changing until kick-off
+    "forebet": 2 * 3600,
+}
+JITTER = 0.1               # +-10% on every cadence, so runs don't hit the sites at fixed times
+RETRY_DELAY = 15 * 60      # after a failed scrape
+BATCH_WINDOW = 10 * 60     # sites due within this window run together with the ones already due
+KEEP_BROWSERS = 20 * 60    # keep the driver pool warm when the next run is this close
+MAINTAIN_INTERVAL = 4 * 3600
+
+# Exit code when another daemon already holds the lock
+EXIT_LOCKED = 3
+
+
+def acquire_lock(path=LOCK_FILE):
+    # Single instance: an OS file lock, released automatically if the process dies
+    f = open(path, "a+")
+    try:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        f.close()
+        return None
+    f.seek(0)
+    f.truncate()
+    f.write(str(os.getpid()))
+    f.flush()
+    return f
+
+
+def write_status(status, path=STATUS_FILE):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(status, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def iso(ts):
+    return datetime.fromtimestamp(ts).isoformat(timespec="seconds") if ts else None
+
+
+class ConsensusDaemon:
+    def __init__(self, workers=MAX_WORKERS, sites=SCRAPE_ORDER):
+        self.workers = workers
+        self.sites = list(sites)
+        self.scraper = ConsensusScraper()
+        self.stop_event = threading.Event()
+        self.started_at = time.time()
+        self.last_maintain = 0
+        self.sites_status = {site: {"name": SITE_NAMES[site], "cadence": self.cadence(site)} for site in self.sites}
+        self.next_run = {}
+        self._restore()
+
+    def cadence(self, site):
+        return SITE_CADENCE.get(site, DEFAULT_CADENCE)
+
+    def _restore(self):
+        # A restarted daemon picks up the previous schedule instead of re-scraping everything at once
+        previous = {}
+        try:
+            with open(STATUS_FILE, "r", encoding="utf-8") as f:
+                previous = json.load(f).get("sites", {})
+        except (OSError, ValueError):
+            pass
+        now = time.time()
+        for site in self.sites:
+            old = previous.get(site) or {}
+            for key in ("last_success", "last_duration", "last_changed", "last_error", "last_run"):
+                if key in old:
+                    self.sites_status[site][key] = old[key]
+            last_success = old.get("last_success_ts") or 0
+            self.sites_status[site]["last_success_ts"] = last_success
+            self.next_run[site] = max(now, last_success + self.cadence(site)) if last_success else now
+
+    def schedule(self, site, now, ok):
+        delay = self.cadence(site) * random.uniform(1 - JITTER, 1 + JITTER) if ok else RETRY_DELAY
+        self.next_run[site] = now + delay
+
+    def status(self, running=()):
+        for site in self.sites:
+            self.sites_status[site]["next_run"] = iso(self.next_run[site])
+            self.sites_status[site]["running"] = site in running
+        return {
+            "pid": os.getpid(),
+            "started_at": iso(self.started_at),
+            "updated_at": iso(time.time()),
+            "running": list(running),
+            "sites": self.sites_status,
+        }
+
+    def run_batch(self, sites):
+        write_status(self.status(running=sites))
+        outcomes = self.scraper.run_sites(sites, workers=min(self.workers, len(sites)))
+        now = time.time()
+        for site in sites:
+            outcome = outcomes.get(site) or {"ok": False, "changed": False, "started": now, "duration": 0}
+            entry = self.sites_status[site]
+            entry["last_run"] = iso(outcome["started"])
+            entry["last_duration"] = round(outcome["duration"], 1)
+            if outcome["ok"]:
+                entry["last_success"] = iso(outcome["started"] + outcome["duration"])
+                entry["last_success_ts"] = outcome["started"] + outcome["duration"]
+                entry["last_changed"] = outcome["changed"]
+                entry.pop("last_error", None)
+            else:
+                entry["last_error"] = iso(now)
+            self.schedule(site, now, outcome["ok"])
+        if now - self.last_maintain > MAINTAIN_INTERVAL:
+            self.scraper.maintain_archive()
+            self.last_maintain = now
+        write_status(self.status())
+
+    def run(self):
+        write_status(self.status())
+        while not self.stop_event.is_set():
+            now = time.time()
+            if any(self.next_run[s] <= now for s in self.sites):
+                # Pull in sites that would be due shortly, one browser session serves them all
+                due = [s for s in self.sites if self.next_run[s] <= now + BATCH_WINDOW]
+                print(f"[DAEMON] Running {', '.join(due)}")
+                # Runs are strictly sequential: a site that becomes due meanwhile waits for the next loop
+                self.run_batch(due)
+                continue
+            wait = min(self.next_run.values()) - now
+            if wait > KEEP_BROWSERS:
+                # Long idle gap: don't hold browser or parser memory until the next run
+                self.scraper.pool.close_all()
+                self.scraper.close_parse_pool()
+            print(f"[DAEMON] Next run in {int(wait)}s")
+            self.stop_event.wait(wait)
+
+    def stop(self, *_):
+        self.stop_event.set()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="parallel browsers per run")
+    parser.add_argument("--sites", nargs="*", metavar="SITE", help="only schedule these sites")
+    args = parser.parse_args()
+
+    lock = acquire_lock()
+    if lock is None:
+        print(f"[DAEMON] Another consensus daemon holds {LOCK_FILE}, exiting")
+        sys.exit(EXIT_LOCKED)
+
+    daemon = ConsensusDaemon(workers=args.workers, sites=args.sites or SCRAPE_ORDER)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+    try:
+        daemon.run()
+    finally:
+        daemon.scraper.pool.close_all()
+        daemon.scraper.close_parse_pool()
+        lock.close()
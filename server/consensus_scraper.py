@@ -1,15 +1,22 @@
 import time
 import json
 import os
-import sqlite3
-import re
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import undetected_chromedriver as uc
+from driver_pool import DriverPool
+from http_fetch import HttpFetcher
+from page_fingerprint import FingerprintStore
+from prediction_store import SCHEMA_VERSION, LazyResults, PredictionStore
+from prediction_archive import PredictionArchive
+from team_index import index_predictions
+from consensus_table import SUMMARY_FILE, ConsensusTable
+from prediction_stream import PredictionStream
+from dom_extract import HAVE_LXML, extract_rows
+from site_parsers import ROW_SPECS, STATAREA_ROWS, parse_page
+from page_ready import ReadinessTracker, all_of, any_of, datatables_ready, document_complete, row_count_stable, selector_present
 
 # CONFIG
 SITES = {
@@ -22,796 +29,385 @@ SITES = {
 
 OUTPUT_FILE = "server/consensus_data.json"
 
+# consensus_data.json is an export of the SQLite store for the proxy; set CONSENSUS_EXPORT_JSON=0 to skip it
+EXPORT_JSON = os.environ.get("CONSENSUS_EXPORT_JSON", "1") != "0"
+
+# Raw page_source of the last capture per site, re-parseable offline
+PAGES_DIR = "server/pages"
+
+SITE_NAMES = {
+    "forebet": "Forebet",
+    "prosoccer": "ProSoccer",
+    "predictz": "PredictZ",
+    "windrawwin": "WinDrawWin",
+    "statarea": "Statarea",
+    "vitibet": "Vitibet",
+    "zulubet": "Zulubet",
+    "olbg": "OLBG",
+}
+
+# Browser profile per site (defaults: desktop, headless)
+DRIVER_PROFILES = {
+    "forebet": {"use_mobile": True, "headless": False},
+    "predictz": {"use_mobile": True, "headless": False},
+    "windrawwin": {"use_mobile": False, "headless": False},
+}
+
+# These sources replace their data even when a run finds nothing
+OVERWRITE_ON_EMPTY = {"zulubet", "olbg"}
+
+# Run order for run_all (each name maps to a scrape_<name> method)
+SCRAPE_ORDER = ["forebet", "prosoccer", "predictz", "windrawwin", "statarea", "vitibet", "zulubet", "olbg"]
+
+# Outcome of scraping one site. FAILED covers capture/parse errors and pages that yielded nothing,
+# so the daemon can retry those sooner instead of treating them like an unchanged source.
+CHANGED, UNCHANGED, FAILED = "changed", "unchanged", "failed"
+
+# Parallel browser limit for run_all (1 = old sequential behaviour)
+MAX_WORKERS = int(os.environ.get("CONSENSUS_WORKERS", "3"))
+
 class ConsensusScraper:
-    def __init__(self):
+    def __init__(self, auto_migrate=True):
         self.results = {}
-        # Load existing data to avoid wiping out sources that haven't run yet
-        if os.path.exists(OUTPUT_FILE):
-            try:
-                with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
-                    raw_data = json.load(f)
-                    # Migration: Convert old "prediction" format to new "markets" format
-                    for site, matches in raw_data.items():
-                        migrated_matches = []
-                        for m in matches:
-                            if "prediction" in m and "markets" not in m:
-                                m["markets"] = {
-                                    "1X2": {
-                                        "pred": m.pop("prediction"),
-                                        "prob": m.pop("probability", "0")
-                                    }
-                                }
-                            migrated_matches.append(m)
-                        self.results[site] = migrated_matches
-                print(f"[CONSENSUS] Loaded and migrated {len(self.results)} sources")
-            except Exception as e:
-                print(f"[CONSENSUS] Could not load/migrate existing data: {e}")
-
-    def get_driver(self, use_mobile=False, headless=True):
-        options = uc.ChromeOptions()
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--window-position=-2000,0') # Open off-screen
-        
-        if use_mobile:
-            options.add_argument('--window-size=375,812')
-        else:
-            options.add_argument('--window-size=1920,1080')
-        
+        self._results_lock = threading.RLock()
+        self.summary_dirty = False   # consensus rows changed since the last summary export
+        self.pool = DriverPool()
+        self.ready = ReadinessTracker()
+        self.parse_pool = None
+        self.fetcher = HttpFetcher()
+        self.fingerprints = FingerprintStore()
+        self.store = PredictionStore()
+        self.archive = PredictionArchive()
+        self.consensus = ConsensusTable(self.store)
+        self.stream = PredictionStream()
+        # --migrate runs it explicitly (forced), so it is skipped here instead of running twice
+        if auto_migrate and self.store.schema_version() < SCHEMA_VERSION:
+            self.migrate()
+        # Sites are loaded on first use, so start-up doesn't read predictions we are about to replace
+        self.results = LazyResults(self.store)
+
+    def migrate(self, path=OUTPUT_FILE):
+        # One-shot upgrade to SCHEMA_VERSION. An empty store is seeded from the consensus_data.json
+        # written by older versions; otherwise the stored rows are upgraded in place.
         try:
-            driver = uc.Chrome(options=options, headless=headless)
-            if not headless:
-                driver.minimize_window()
-            return driver
+            if self.store.is_empty() and os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    raw_data = json.load(f)
+            else:
+                raw_data = self.store.load_all()
+            for site, matches in raw_data.items():
+                # Migration: Convert old "prediction" format to new "markets" format
+                migrated = False
+                for m in matches:
+                    if "prediction" in m and "markets" not in m:
+                        m["markets"] = {
+                            "1X2": {
+                                "pred": m.pop("prediction"),
+                                "prob": m.pop("probability", "0")
+                            }
+                        }
+                        migrated = True
+                    # v2: canonical team ids / match key
+                    if "match_key" not in m:
+                        index_predictions([m])
+                        migrated = True
+                if migrated or not self.store.has_site(site):
+                    self.store.replace_site(site, matches)
+            # v3: pre-aggregated consensus rows (v4: rebuilt without prob_src probabilities)
+            self.consensus.rebuild()
+            self.summary_dirty = True
+            self.store.set_schema_version(SCHEMA_VERSION)
+            print(f"[CONSENSUS] Store migrated to schema v{SCHEMA_VERSION} ({len(raw_data)} sources)")
         except Exception as e:
-            print(f"[CONSENSUS] Driver failed: {e}")
-            return uc.Chrome(headless=True)
+            print(f"[CONSENSUS] Could not load/migrate existing data: {e}")
+
+    def set_results(self, site, predictions):
+        # Scrapers may run on worker threads, all writes go through the lock
+        with self._results_lock:
+            self.store.replace_site(site, predictions)
+            self.results[site] = predictions
+            # Only the matches this site voted on are re-aggregated
+            touched = self.consensus.update_site(site, predictions)
+            self.summary_dirty = self.summary_dirty or touched > 0
+            print(f"[CONSENSUS] {SITE_NAMES.get(site, site)}: consensus updated for {touched} matches")
 
     def save_results(self):
-        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-            json.dump(self.results, f, ensure_ascii=False, indent=4)
-        print(f"[CONSENSUS] Data saved to {OUTPUT_FILE}")
+        # Every site is already committed to the store; this only refreshes the JSON exports, once per run
+        with self._results_lock:
+            # The proxy re-reads the summary on mtime change, so it is only rewritten when a site touched it
+            if self.summary_dirty:
+                self.consensus.export_json(SUMMARY_FILE)
+                self.summary_dirty = False
+        if not EXPORT_JSON:
+            return
+        with self._results_lock:
+            self.store.export_json(OUTPUT_FILE)
+        print(f"[CONSENSUS] Data exported to {OUTPUT_FILE}")
+
+    # --- Capture: drive the browser until the page is ready. Returning False means "nothing to parse". ---
+
+    def capture_forebet(self, driver):
+        # Main Today Page
+        url = "https://m.forebet.com/en/football-tips-and-predictions-for-today"
+        driver.get(url)
+        self.ready.wait(driver, "forebet", row_count_stable(".rcnt"))
+
+    def capture_prosoccer(self, driver):
+        driver.get(SITES["prosoccer"])
+        # Wait for DataTables initialization
+        self.ready.wait(driver, "prosoccer", any_of(datatables_ready("#tblPredictions"), row_count_stable("#tblPredictions tbody tr", settle=2)))
 
-    def scrape_forebet(self):
-        print("[CONSENSUS] Scraping Forebet (Full Market Support)...")
-        driver = self.get_driver(use_mobile=True, headless=False)
+    def capture_predictz(self, driver):
+        url = SITES["predictz"]
+        driver.get(url)
+        self.ready.wait(driver, "predictz", row_count_stable(ROW_SPECS["predictz"]["rows"]))
+        
+        driver.save_screenshot("server/predictz_debug.png")
+        
+        # Consent (Çerez Onayı) butonu kontrolü
         try:
-            # Main Today Page
-            url = "https://m.forebet.com/en/football-tips-and-predictions-for-today"
-            driver.get(url)
-            time.sleep(12) 
-            
-            predictions = []
-            rows = driver.find_elements("css selector", ".rcnt")
-            print(f"[CONSENSUS] Forebet: Found {len(rows)} matching rows")
-            
-            for row in rows:
-                try:
-                    home = row.find_element("css selector", ".homeTeam span").get_attribute("textContent").strip()
-                    away = row.find_element("css selector", ".awayTeam span").get_attribute("textContent").strip()
-                    
-                    # League extraction
-                    league = "Unknown"
-                    try:
-                        # On mobile, league name is often hidden in onclick of .flsc
-                        league_img = row.find_element("css selector", ".flsc")
-                        onclick_attr = league_img.get_attribute("onclick")
-                        if onclick_attr and "getstag" in onclick_attr:
-                            # getstag(this, ID, 'Country', 'League', 'URL', 'Code')
-                            # Example: getstag(this, 1234, 'England', 'Premier League', ...)
-                            match = re.search(r"getstag\(.*?,\s*.*?,\s*'(.*?)',\s*'(.*?)'", onclick_attr)
-                            if match:
-                                country = match.group(1)
-                                comp = match.group(2)
-                                league = f"{country} {comp}".strip()
-                        
-                        if league == "Unknown":
-                            # Fallback to title/alt or .shortTag
-                            league = league_img.get_attribute("title") or league_img.get_attribute("alt")
-                            if not league:
-                                try:
-                                    league = row.find_element("css selector", ".shortTag").text.strip()
-                                except: pass
-                            if not league: league = "Unknown"
-                            
-                        # Double-check league name for script junk
-                        if league and ("adsbygoogle" in league or "{" in league):
-                            league = "Unknown"
-                    except: pass
-
-                    # 1X2 Prediction & Main Prob
-                    tip_1x2 = row.find_element("css selector", ".forepr span, .fpr span, .forepr").get_attribute("textContent").strip()
-                    prob_1x2 = "0"
-                    try:
-                        prob_1x2 = row.find_element("css selector", ".fprc span.fpr").get_attribute("textContent").strip()
-                    except: pass
-
-                    # Initialize match object with multiple markets
-                    match_obj = {
-                        "home": home, "away": away,
-                        "league": league,
-                        "timestamp": datetime.now().isoformat(),
-                        "markets": {
-                            "1X2": {"pred": tip_1x2, "prob": prob_1x2}
-                        }
-                    }
-
-                    # Forebet often shows OU and BTTS probabilities as small bar/colors or mini icons
-                    # We focus on the most reliable 1X2 for now, but mark it for future sub-page scraping if needed
-                    
-                    if home and away:
-                        # Date and Time extraction (e.g. 02/01/2026 18:00)
-                        try:
-                            time_text = row.find_element("css selector", "time span").get_attribute("textContent").strip()
-                            # Date: DD/MM
-                            m_date = re.search(r'(\d{2})/(\d{2})', time_text)
-                            match_obj["date"] = f"{m_date.group(1)}.{m_date.group(2)}" if m_date else datetime.now().strftime("%d.%m")
-                            
-                            # Time: HH:MM
-                            m_time = re.search(r'(\d{2}:\d{2})', time_text)
-                            if m_time: match_obj["time"] = m_time.group(1)
-                        except:
-                            match_obj["date"] = datetime.now().strftime("%d.%m")
-                        
-                        predictions.append(match_obj)
-                except: continue
-            
-            if predictions:
-                self.results["forebet"] = predictions
-            else:
-                 print("[CONSENSUS] Forebet: No predictions found.")
-        except Exception as e: print(f"[CONSENSUS] Forebet error: {e}")
-        finally: driver.quit()
+            consent = driver.find_element("css selector", "button[aria-label='Consent'], .fc-cta-consent, .qc-cmp2-footer button")
+            consent.click()
+            # The banner can re-render the table; wait until the rows settle again
+            self.ready.wait(driver, "predictz_consent", row_count_stable(ROW_SPECS["predictz"]["rows"]), default=10)
+        except: pass
 
-    def scrape_prosoccer(self):
-        print("[CONSENSUS] Scraping ProSoccer.gr...")
-        driver = self.get_driver(use_mobile=False)
+    def capture_windrawwin(self, driver):
+        # Önce ana sayfaya git, sonra tahminlere
+        driver.get("https://www.windrawwin.com/")
+        self.ready.wait(driver, "windrawwin_home", document_complete(), default=10)
+        # Go to kick-off time page to get times
+        url = "https://www.windrawwin.com/predictions/today/kick-off-time/"
+        driver.get(url)
+        self.ready.wait(driver, "windrawwin", row_count_stable(ROW_SPECS["windrawwin"]["rows"]))
+        
+        driver.save_screenshot("server/windrawwin_debug.png")
+
+    def capture_statarea(self, driver):
+        url = SITES["statarea"]
+        driver.get(url)
+        self.ready.wait(driver, "statarea", any_of(row_count_stable(STATAREA_ROWS), selector_present("a[href*='/predictions/day/0']")))
+        # Statarea ana sayfada tahminleri göstermezse "Day" seçeneğine bak
         try:
-            driver.get(SITES["prosoccer"])
-            time.sleep(10) # Wait for DataTables initialization
-            
-            predictions = []
-            # ProSoccer rows are in #tblPredictions
-            rows = driver.find_elements("css selector", "#tblPredictions tbody tr")
-            print(f"[CONSENSUS] ProSoccer: Found {len(rows)} rows")
-            
-            for row in rows:
-                try:
-                    cells = row.find_elements("xpath", "./td")
-                    if len(cells) < 14: continue
-                    
-                    # Teams: index 2 (td.mio.fc1)
-                    teams_text = cells[2].get_attribute("textContent").strip().replace('\xa0', ' ')
-                    if " - " not in teams_text: continue
-                    home, away = teams_text.split(" - ", 1)
-                    
-                    # 1 X 2 Tip (cells[6])
-                    raw_tip = cells[6].get_attribute("textContent").strip().lower()
-                    tip_1x2 = "N/A"
-                    if "a1" == raw_tip: tip_1x2 = "1"
-                    elif "ax" == raw_tip: tip_1x2 = "X"
-                    elif "a2" == raw_tip: tip_1x2 = "2"
-                    elif "a1x" == raw_tip: tip_1x2 = "1X"
-                    elif "ax2" == raw_tip: tip_1x2 = "X2"
-                    elif "a12" == raw_tip: tip_1x2 = "12"
-                    
-                    # OU 2.5 (Under: cells[12], Over: cells[13])
-                    try:
-                        under_prob = int(cells[12].get_attribute("textContent").strip())
-                        over_prob = int(cells[13].get_attribute("textContent").strip())
-                        tip_ou = "OVER" if over_prob > under_prob else "UNDER"
-                    except:
-                        tip_ou = "N/A"
-                    
-                    m_time = ""
-                    try:
-                        # Try finding by class fc7 which often contains the time
-                        time_el = row.find_element("css selector", "td.fc7")
-                        m_time = time_el.get_attribute("textContent").strip()
-                    except:
-                        # Fallback to regex on first few cells
-                        for cell in cells[:3]:
-                            txt = cell.get_attribute("textContent").strip()
-                            t_match = re.search(r'(\d{2}:\d{2})', txt)
-                            if t_match:
-                                m_time = t_match.group(1)
-                                break
-
-                    match_obj = {
-                        "home": home.strip(), "away": away.strip(),
-                        "timestamp": datetime.now().isoformat(),
-                        "markets": {
-                            "1X2": {"pred": tip_1x2, "prob": "0"},
-                            "OU25": {"pred": tip_ou}
-                        },
-                        "date": datetime.now().strftime("%d.%m"),
-                        "time": m_time
-                    }
-                    
-                    predictions.append(match_obj)
-                except: continue
-                
-            if predictions: 
-                self.results["prosoccer"] = predictions
-                print(f"[CONSENSUS] ProSoccer: Scraped {len(predictions)} matches")
-        except Exception as e: 
-            print(f"[CONSENSUS] ProSoccer error: {e}")
-        finally: 
-            driver.quit()
-
-    def scrape_predictz(self):
-        print("[CONSENSUS] Scraping PredictZ (Non-Headless)...")
-        driver = self.get_driver(use_mobile=True, headless=False)
+            # Bugünün tahminleri için butona bas
+            day_btn = driver.find_element("css selector", "a[href*='/predictions/day/0']")
+            day_btn.click()
+            self.ready.wait(driver, "statarea_day", row_count_stable(STATAREA_ROWS), default=15)
+        except: pass
+
+    def capture_vitibet(self, driver):
+        url = "https://www.vitibet.com/index.php?clanek=quicktips&sekce=fotbal&lang=en"
+        driver.get(url)
+        # Vitibet uses a standard table for quicktips
+        self.ready.wait(driver, "vitibet", all_of(selector_present("tr.odseknutiligy"), row_count_stable("table tr")))
+
+    def capture_zulubet(self, driver):
+        driver.get("https://www.zulubet.com/")
+        self.ready.wait(driver, "zulubet", row_count_stable(ROW_SPECS["zulubet"]["rows"]))
+
+    def capture_olbg(self, driver):
+        driver.get("https://www.olbg.com/betting-tips/Football/1")
+        # Wait for the list to load
+        if not self.ready.wait(driver, "olbg", row_count_stable(ROW_SPECS["olbg"]["rows"])):
+            print("[CONSENSUS] OLBG: List did not load, keeping old ones.")
+            return False
+
+    # --- Capture -> release browser -> parse ---
+
+    def save_page(self, site, html):
         try:
-            url = SITES["predictz"]
-            driver.get(url)
-            time.sleep(15)
-            
-            driver.save_screenshot("server/predictz_debug.png")
-            
-            # Consent (Çerez Onayı) butonu kontrolü
+            os.makedirs(PAGES_DIR, exist_ok=True)
+            with open(os.path.join(PAGES_DIR, f"{site}.html"), 'wb') as f:
+                f.write(html.encode('utf-8') if isinstance(html, str) else html)
+        except Exception as e:
+            print(f"[CONSENSUS] Could not save page for {site}: {e}")
+
+    def snapshot(self, site, driver):
+        # Everything we need from the live page; after this the browser can go back to the pool
+        html = driver.page_source
+        self.save_page(site, html)
+        # Without lxml the rows have to come out of the live DOM instead
+        rows = None if HAVE_LXML else extract_rows(driver, ROW_SPECS[site])
+        return html, rows
+
+    def parse_page(self, site, html=None, rows=None, force=False):
+        # Sites we already hold data for are skipped when their rows hash the same as last time
+        skip = None
+        if not force and self.results.get(site):
+            skip = self.fingerprints.get(site)
+        if self.parse_pool is not None and rows is None:
+            return self.parse_pool.submit(parse_page, site, html, None, skip).result()
+        return parse_page(site, html, rows, skip)
+
+    def apply_predictions(self, site, row_count, fingerprint, predictions):
+        # CHANGED when self.results[site] was replaced
+        name = SITE_NAMES[site]
+        if predictions is None:
+            print(f"[CONSENSUS] {name}: {row_count} rows unchanged since last run, keeping existing predictions")
+            self.store.touch_site(site)
+            return UNCHANGED
+        print(f"[CONSENSUS] {name}: Found {row_count} rows, parsed {len(predictions)} predictions")
+        if predictions or site in OVERWRITE_ON_EMPTY:
+            index_predictions(predictions)
+            # Stream first: readers see the matches before the store commit and the end-of-run export
+            self.stream.publish(site, predictions)
+            self.set_results(site, predictions)
+            self.fingerprints.set(site, fingerprint)
             try:
-                consent = driver.find_element("css selector", "button[aria-label='Consent'], .fc-cta-consent, .qc-cmp2-footer button")
-                consent.click()
-                time.sleep(2)
-            except: pass
-            
-            predictions = []
-            # Predictz satırları için daha esnek seçiciler
-            rows = driver.find_elements("css selector", ".pttr, .pt-prediction-row, tr[class*='pttr'], [class*='prediction-container']")
-            print(f"[CONSENSUS] PredictZ: Found {len(rows)} rows")
-            
-            for row in rows:
-                try:
-                    # League extraction (find preceding league header)
-                    league = "Unknown"
-                    try:
-                        # Find the preceding sibling header or parent container header
-                        league_el = row.find_element("xpath", "./preceding-sibling::div[contains(@class, 'ptlg') or contains(@class, 'pttd')][1]//h2")
-                        league = league_el.text.strip().replace(" Tips", "")
-                    except: 
-                        # Fallback: maybe it's inside the row or we need a broader search
-                        try:
-                            league = driver.execute_script("return arguments[0].previousElementSibling.innerText;", row)
-                            if "adsbygoogle" in league or "function" in league or "{" in league:
-                                league = "Unknown"
-                        except: pass
-                    
-                    # PredictZ yeni seçiciler (Sub-agent: .pttd.ptgame a)
-                    home_away = row.find_element("css selector", ".pttd.ptgame a, .ptgame").get_attribute("textContent").strip()
-                    if ' v ' in home_away:
-                        home, away = home_away.split(' v ')
-                    elif ' - ' in home_away:
-                        home, away = home_away.split(' - ')
-                    else: continue
-                    
-                    # Prediction Score (PredictZ usually has a score prediction)
-                    # Sub-agent: .ptpredboxsml often contains score like "2-1" or "1"
-                    pred_el = row.find_element("css selector", ".ptpredboxsml, .ptprd")
-                    pred_text = pred_el.get_attribute("textContent").strip().lower()
-                    
-                    score_match = re.search(r'(\d+)-(\d+)', pred_text)
-                    pred = "N/A"
-                    markets = {}
-                    
-                    if score_match:
-                        h_score = int(score_match.group(1))
-                        a_score = int(score_match.group(2))
-                        # Inferred Markets
-                        markets["BTTS"] = {"pred": "Yes" if h_score > 0 and a_score > 0 else "No"}
-                        markets["OU25"] = {"pred": "OVER" if (h_score + a_score) > 2.5 else "UNDER"}
-                        # Determine 1X2 from score
-                        if h_score > a_score: pred = "1"
-                        elif h_score < a_score: pred = "2"
-                        else: pred = "X"
-                    else:
-                        if "home" in pred_text or pred_text.startswith("1"): pred = "1"
-                        elif "draw" in pred_text or "x" in pred_text: pred = "X"
-                        elif "away" in pred_text or pred_text.startswith("2"): pred = "2"
-                    
-                    markets["1X2"] = {"pred": pred}
-                    
-                    if home and away:
-                        predictions.append({
-                            "home": home.strip(), "away": away.strip(), 
-                            "league": league, # Added league
-                            "markets": markets,
-                            "timestamp": datetime.now().isoformat(),
-                            "date": datetime.now().strftime("%d.%m")
-                        })
-                except: continue
-            
-            if predictions:
-                self.results["predictz"] = predictions
-            else:
-                print("[CONSENSUS] PredictZ: No new predictions found, keeping old ones.")
-        except Exception as e: print(f"[CONSENSUS] PredictZ error: {e}")
-        finally: driver.quit()
+                self.archive.append(site, predictions)
+            except Exception as e:
+                print(f"[CONSENSUS] {name}: could not archive predictions: {e}")
+            return CHANGED
+        print(f"[CONSENSUS] {name}: No new predictions found, keeping old ones.")
+        return FAILED
 
-    def scrape_windrawwin(self):
-        print("[CONSENSUS] Scraping WinDrawWin (Non-Headless)...")
-        driver = self.get_driver(use_mobile=False, headless=False)
-        try:
-            # Önce ana sayfaya git, sonra tahminlere
-            driver.get("https://www.windrawwin.com/")
-            time.sleep(5)
-            # Go to kick-off time page to get times
-            url = "https://www.windrawwin.com/predictions/today/kick-off-time/"
-            driver.get(url)
-            time.sleep(15)
-            
-            driver.save_screenshot("server/windrawwin_debug.png")
-            
-            predictions = []
-            # WinDrawWin ana tahmin tablosundaki satırları bul
-            rows = driver.find_elements("css selector", ".wttr, [class*='wttr'], tr[class*='wttr']")
-            print(f"[CONSENSUS] WinDrawWin: Found {len(rows)} rows")
-            
-            for row in rows:
-                try:
-                    # League extraction
-                    league = "Unknown"
-                    try:
-                        league_el = row.find_element("xpath", "./preceding-sibling::div[contains(@class, 'wtlg') or contains(@class, 'wtfixt')][1]")
-                        league = league_el.text.strip().split('\n')[0].replace(" Predictions", "")
-                    except: pass
-
-                    # WinDrawWin: Updated selectors based on sub-agent scan
-                    # Match name is usually in .wtdesklnk or .wtfixt a
-                    match_el = None
-                    for selector in [".wtdesklnk", ".wtfixt a", ".wtmoblnk"]:
-                        try:
-                            match_el = row.find_element("css selector", selector)
-                            if match_el: break
-                        except: continue
-                    
-                    if not match_el: continue
-                    match_name = match_el.text.strip()
-                    if ' v ' not in match_name: continue
-                    home, away = match_name.split(' v ')
-                    
-                    # Predictions Score: .wtprd or last cell
-                    pred_el = row.find_element("css selector", ".wtprd")
-                    pred_text = pred_el.text.strip().lower() # e.g. "home win 2-1"
-                    
-                    score_match = re.search(r'(\d+)-(\d+)', pred_text)
-                    pred = "N/A"
-                    markets = {}
-                    
-                    if score_match:
-                        h_score = int(score_match.group(1))
-                        a_score = int(score_match.group(2))
-                        markets["BTTS"] = {"pred": "Yes" if h_score > 0 and a_score > 0 else "No"}
-                        markets["OU25"] = {"pred": "OVER" if (h_score + a_score) > 2.5 else "UNDER"}
-                        if h_score > a_score: pred = "1"
-                        elif h_score < a_score: pred = "2"
-                        else: pred = "X"
-                    else:
-                        if "home" in pred_text: pred = "1"
-                        elif "draw" in pred_text: pred = "X"
-                        elif "away" in pred_text: pred = "2"
-                    
-                    markets["1X2"] = {"pred": pred}
-                    
-                    if home and away and pred != "N/A":
-                        m_time = ""
-                        try:
-                            # Time is often in a separate div or before/after in parent
-                            # In kick-off page, it might be in .wtfixt or similar
-                            time_match = re.search(r'(\d{2}:\d{2})', row.text)
-                            if time_match: m_time = time_match.group(1)
-                        except: pass
-
-                        predictions.append({
-                            "home": home.strip(), "away": away.strip(), 
-                            "league": league,
-                            "markets": markets,
-                            "timestamp": datetime.now().isoformat(),
-                            "date": datetime.now().strftime("%d.%m"),
-                            "time": m_time
-                        })
-                except: continue
-            
-            if predictions:
-                self.results["windrawwin"] = predictions
-            else:
-                print("[CONSENSUS] WinDrawWin: No new predictions found, keeping old ones.")
-        except Exception as e: print(f"[CONSENSUS] WinDrawWin error: {e}")
-        finally: driver.quit()
+    def scrape_http(self, site):
+        # Plain HTTP first for server-rendered sources.
+        # Returns None when the browser is needed, otherwise apply_predictions' outcome.
+        if not HAVE_LXML or not self.fetcher.should_try(site):
+            return None
+        html = self.fetcher.fetch_page(site)
+        if html is not None:
+            try:
+                row_count, fingerprint, predictions = self.parse_page(site, html)
+                if row_count > 0:
+                    self.save_page(site, html)
+                    self.fetcher.remember(site, "http")
+                    return self.apply_predictions(site, row_count, fingerprint, predictions)
+                print(f"[CONSENSUS] {SITE_NAMES[site]}: HTTP page had no rows, falling back to browser")
+            except Exception as e:
+                print(f"[CONSENSUS] {SITE_NAMES[site]}: HTTP parse error ({e}), falling back to browser")
+        self.fetcher.remember(site, "browser")
+        return None
 
-    def scrape_statarea(self):
-        print("[CONSENSUS] Scraping Statarea...")
-        driver = self.get_driver()
+    def scrape(self, site):
+        # CHANGED, UNCHANGED or FAILED
+        name = SITE_NAMES[site]
+        print(f"[CONSENSUS] Scraping {name}...")
+        outcome = self.scrape_http(site)
+        if outcome is not None:
+            return outcome
+
+        page = None
+        driver = self.pool.acquire(**DRIVER_PROFILES.get(site, {}))
         try:
-            url = SITES["statarea"]
-            driver.get(url)
-            time.sleep(15)
-            # Statarea ana sayfada tahminleri göstermezse "Day" seçeneğine bak
-            try:
-                # Bugünün tahminleri için butona bas
-                day_btn = driver.find_element("css selector", "a[href*='/predictions/day/0']")
-                day_btn.click()
-                time.sleep(5)
-            except: pass
-            
-            predictions = []
-            # Statarea için güncel (2025/2026) seçiciler
-            rows = driver.find_elements("css selector", "div.cmatch, .match-container, div[class*='match']")
-            print(f"[CONSENSUS] Statarea: Found {len(rows)} potential match blocks")
-            
-            for row in rows:
-                try:
-                    # Takım isimleri
-                    teams = row.find_elements("css selector", ".home, .away, .team")
-                    if len(teams) >= 2:
-                        home = teams[0].text.strip()
-                        away = teams[1].text.strip()
-                    else:
-                        txt = row.get_attribute("textContent").strip().split('\n')[0]
-                        if ' - ' in txt: home, away = txt.split(' - ', 1)
-                        else:
-                            # Try home/away search in sub-elements
-                            try:
-                                home = row.find_element(By.CSS_SELECTOR, ".home, .team:nth-child(1)").text.strip()
-                                away = row.find_element(By.CSS_SELECTOR, ".away, .team:nth-child(2)").text.strip()
-                            except: continue
-                    
-                    # Tahmin (Tip)
-                    try:
-                        tip_el = row.find_element("css selector", ".tip, .prediction, [class*='tip']")
-                        tip_text = tip_el.text.strip().upper()
-                        pred = "N/A"
-                        if "1" in tip_text: pred = "1"
-                        elif "X" in tip_text or "0" in tip_text: pred = "X"
-                        elif "2" in tip_text: pred = "2"
-                    except: pred = "N/A"
-                    
-                    if home and away and pred != "N/A":
-                        m_time = ""
-                        try:
-                            m_time = row.find_element("css selector", "div.time").text.strip()
-                        except: pass
-                        
-                        predictions.append({
-                            "home": home, "away": away, 
-                            "date": datetime.now().strftime("%d.%m"),
-                            "time": m_time,
-                            "markets": {
-                                "1X2": {"pred": pred}
-                            },
-                            "timestamp": datetime.now().isoformat()
-                        })
-                except: continue
-            
-            if predictions:
-                self.results["statarea"] = predictions
-            else:
-                 print("[CONSENSUS] Statarea: No new predictions found, keeping old ones.")
-        except Exception as e: print(f"[CONSENSUS] Statarea error: {e}")
-        finally: driver.quit()
+            if getattr(self, f"capture_{site}")(driver) is not False:
+                page = self.snapshot(site, driver)
+        except Exception as e: print(f"[CONSENSUS] {name} error: {e}")
+        finally: self.pool.release(driver)
 
-    def scrape_vitibet(self):
-        print("[CONSENSUS] Scraping Vitibet...")
-        driver = self.get_driver()
+        if page is None: return FAILED
         try:
-            url = "https://www.vitibet.com/index.php?clanek=quicktips&sekce=fotbal&lang=en"
-            driver.get(url)
-            time.sleep(10)
-            predictions = []
-            
-            # Vitibet uses a standard table for quicktips
-            rows = driver.find_elements("css selector", "table tr")
-            print(f"[CONSENSUS] Vitibet: Found {len(rows)} potential rows")
-            
-            current_league = "Unknown"
-            for i, row in enumerate(rows):
-                try:
-                    # Check for league header
-                    row_class = row.get_attribute("class") or ""
-                    if "odseknutiligy" in row_class:
-                        try:
-                            # Try to get text from <a> or directly from the row
-                            header_a = row.find_elements("css selector", "a")
-                            temp_league = ""
-                            if header_a:
-                                temp_league = header_a[0].get_attribute("textContent").strip()
-                            
-                            if not temp_league:
-                                temp_league = row.get_attribute("textContent").strip()
-                            
-                            if temp_league:
-                                # Clean up league name (remove counts like (12))
-                                current_league = re.sub(r'\s*\(\d+\)$', '', temp_league).strip()
-                            continue
-                        except: pass
-
-                    cells = row.find_elements("xpath", "./td")
-                    if len(cells) < 12: continue
-                    
-                    # Tarih deseni kontrolü (Satırın maç satırı olduğundan emin olmak için)
-                    date_text = cells[0].get_attribute("textContent").strip()
-                    if not re.match(r"^\d{2}\.\d{2}$", date_text): continue
-                    
-                    home = cells[2].get_attribute("textContent").strip()
-                    away = cells[3].get_attribute("textContent").strip()
-                    league = current_league # Use sticky league
-                    
-                    # Score Inference
-                    score_h = cells[5].get_attribute("textContent").strip()
-                    score_a = cells[7].get_attribute("textContent").strip()
-                    
-                    markets = {}
-                    if score_h.isdigit() and score_a.isdigit():
-                        h_val = int(score_h)
-                        a_val = int(score_a)
-                        markets["BTTS"] = {"pred": "Yes" if h_val > 0 and a_val > 0 else "No"}
-                        markets["OU25"] = {"pred": "OVER" if (h_val + a_val) > 2.5 else "UNDER"}
-                    
-                    tip_raw = cells[11].get_attribute("textContent").strip()
-                    if not home or not away or not tip_raw: continue
-                    
-                    pred = "N/A"
-                    if tip_raw in ["1", "10", "1X"]: pred = "1"
-                    elif tip_raw in ["0", "X", "0-0", "0X", "X0"]: pred = "X"
-                    elif tip_raw in ["2", "02", "X2"]: pred = "2"
-                    
-                    if pred != "N/A":
-                        markets["1X2"] = {"pred": pred}
-                        predictions.append({
-                            "home": home, "away": away, 
-                            "league": league, # Added league
-                            "date": date_text,
-                            "markets": markets,
-                            "timestamp": datetime.now().isoformat()
-                        })
-                except: continue
-            
-            if predictions:
-                self.results["vitibet"] = predictions
-            else:
-                print("[CONSENSUS] Vitibet: No new predictions found, keeping old ones.")
-        except Exception as e: print(f"[CONSENSUS] Vitibet error: {e}")
-        finally: driver.quit()
+            row_count, fingerprint, predictions = self.parse_page(site, *page)
+            return self.apply_predictions(site, row_count, fingerprint, predictions)
+        except Exception as e: print(f"[CONSENSUS] {name} parse error: {e}")
+        return FAILED
 
-    def scrape_zulubet(self):
-        print("[CONSENSUS] Scraping Zulubet...")
-        driver = self.get_driver()
+    def reparse_saved(self, site, path=None):
+        # Re-run the parse step on a saved page, no browser involved
+        path = path or os.path.join(PAGES_DIR, f"{site}.html")
+        with open(path, 'rb') as f:
+            html = f.read()
+        started = time.time()
+        # Forced: a re-parse (e.g. after a PARSER_VERSION bump) must never be skipped by a stored fingerprint
+        row_count, fingerprint, predictions = self.parse_page(site, html, force=True)
+        print(f"[CONSENSUS] {SITE_NAMES[site]}: Re-parsed {path} in {(time.time() - started) * 1000:.0f}ms")
+        return self.apply_predictions(site, row_count, fingerprint, predictions)
+
+    def scrape_forebet(self): return self.scrape("forebet")
+    def scrape_prosoccer(self): return self.scrape("prosoccer")
+    def scrape_predictz(self): return self.scrape("predictz")
+    def scrape_windrawwin(self): return self.scrape("windrawwin")
+    def scrape_statarea(self): return self.scrape("statarea")
+    def scrape_vitibet(self): return self.scrape("vitibet")
+    def scrape_zulubet(self): return self.scrape("zulubet")
+    def scrape_olbg(self): return self.scrape("olbg")
+
+    def run_site(self, site):
+        # {"ok", "changed", "started", "duration"}; ok is False when the scrape failed or raised
+        started = time.time()
         try:
-            driver.get("https://www.zulubet.com/")
-            time.sleep(10)
-            predictions = []
-            
-            # Find the main table explicitly
-            table = driver.find_element("css selector", "table.content_table")
-            rows = table.find_elements("css selector", "tr")
-            print(f"[CONSENSUS] Zulubet: Found {len(rows)} potential rows")
-            
-            for row in rows:
-                try:
-                    # Get only direct child TDs to avoid nested table confusion
-                    cells = row.find_elements("xpath", "./td")
-                    if len(cells) < 7: continue
-                    
-                    # Match name is usually in cell index 1
-                    match_el = cells[1]
-                    txt = match_el.get_attribute("textContent").strip()
-                    if " - " not in txt: continue
-                    
-                    # League info - try to get from title of flag img in cell 1
-                    league = "Unknown"
-                    try:
-                        flag = match_el.find_element("css selector", "img.flags")
-                        league = flag.get_attribute("title") or flag.get_attribute("alt") or "Unknown"
-                    except: pass
-                    
-                    # Extract teams from the text
-                    parts = txt.split(" - ")
-                    if len(parts) >= 2:
-                        home = parts[0].strip().split('\n')[-1].strip()
-                        away = parts[1].strip().split('\n')[0].strip()
-                        
-                        # Tip is in index 6
-                        tip = cells[6].get_attribute("textContent").strip()
-                        
-                        # Double chance support: 1X, X2, 12
-                        pred = "N/A"
-                        if tip in ["1", "X", "2", "1X", "X2", "12"]:
-                            pred = tip
-                        
-                        if home and away and pred != "N/A":
-                            m_date = datetime.now().strftime("%d.%m")
-                            m_time = ""
-                            try:
-                                # cells[0] usually: "02-01, 14:00"
-                                time_txt = cells[0].get_attribute("textContent").strip()
-                                t_match = re.search(r'(\d{2}:\d{2})', time_txt)
-                                if t_match: m_time = t_match.group(1)
-                            except: pass
-
-                            predictions.append({
-                                "home": home, "away": away, 
-                                "league": league,
-                                "date": m_date,
-                                "time": m_time,
-                                "markets": {
-                                    "1X2": {"pred": pred}
-                                },
-                                "timestamp": datetime.now().isoformat()
-                            })
-                except: continue
-            self.results["zulubet"] = predictions
-        except Exception as e: print(f"[CONSENSUS] Zulubet error: {e}")
-        finally: driver.quit()
-
-    def scrape_olbg(self):
-        print("[CONSENSUS] Scraping OLBG (Global Popular Bets)...")
-        driver = self.get_driver()
+            # Results are committed to the store per site; the JSON export happens once at the end of the run
+            outcome = getattr(self, f"scrape_{site}")()
+        except Exception as e:
+            print(f"[CONSENSUS] {site} failed: {e}")
+            outcome = FAILED
+        changed = outcome == CHANGED
+        self.stream.site_done(site, len(self.results.get(site, [])), changed)
+        return {"ok": outcome != FAILED, "changed": changed, "started": started, "duration": time.time() - started}
+
+    def run_sites(self, sites, workers=None):
+        # One run over the given sites; returns run_site's outcome per site
+        workers = MAX_WORKERS if workers is None else workers
+        started = time.time()
+        print(f"[CONSENSUS] Starting run of {len(sites)} sites at {datetime.now().isoformat()} (workers: {workers})")
+        self.stream.start_run(sites)
+        outcomes = {}
+
+        if workers <= 1:
+            # Execute sequentially with fresh drivers
+            for i, site in enumerate(sites):
+                outcomes[site] = self.run_site(site)
+                if i < len(sites) - 1:
+                    time.sleep(5) # Cooldown between sites
+        else:
+            # Sites are independent, so a run only takes as long as the slowest one.
+            # Parsing is CPU work, it goes to a process pool while the threads keep browsers busy.
+            self.start_parse_pool(workers)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="consensus") as pool:
+                futures = {pool.submit(self.run_site, site): site for site in sites}
+                for future in as_completed(futures):
+                    outcomes[futures[future]] = future.result()
+                    print(f"[CONSENSUS] {futures[future]} finished ({int(time.time() - started)}s into run)")
+
+        self.save_results()
+        self.stream.end_run(time.time() - started)
+        print(f"[CONSENSUS] Run finished in {int(time.time() - started)}s")
+        return outcomes
+
+    def start_parse_pool(self, workers):
+        # Kept across runs (the daemon closes it with the browsers), so the children's imports are paid once.
+        # Spawned, not forked: the daemon already runs browser and store threads, and a forked child
+        # would inherit their locks in whatever state they were in
+        if self.parse_pool is None and HAVE_LXML:
+            self.parse_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def close_parse_pool(self):
+        if self.parse_pool is not None:
+            self.parse_pool.shutdown()
+            self.parse_pool = None
+
+    def maintain_archive(self):
         try:
-            driver.get("https://www.olbg.com/betting-tips/Football/1")
-            # Wait for the list to load
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "li:has(h5)"))
-            )
-            time.sleep(5)
-            
-            predictions = []
-            rows = driver.find_elements(By.CSS_SELECTOR, "li:has(h5)")
-            print(f"[CONSENSUS] OLBG: Found {len(rows)} potential rows")
-            
-            for row in rows:
-                try:
-                    # Teams: "Home v Away"
-                    teams_el = row.find_element(By.CSS_SELECTOR, ".rw.ev h5")
-                    teams_text = teams_el.get_attribute("textContent").strip()
-                    if " v " not in teams_text: continue
-                    
-                    home_away = teams_text.split(" v ")
-                    home = home_away[0].strip()
-                    away = home_away[1].strip()
-                    
-                    # League
-                    league = "Unknown"
-                    try:
-                        league_el = row.find_element(By.CSS_SELECTOR, ".rw.ev p.text-sm")
-                        league = league_el.get_attribute("textContent").strip()
-                    except: pass
-
-                    # Date and Time extraction
-                    m_date = datetime.now().strftime("%d.%m")
-                    m_time = ""
-                    try:
-                        # OLBG uses <time itemprop="startDate" datetime="...">
-                        time_el = row.find_element(By.CSS_SELECTOR, "time")
-                        iso_date = time_el.get_attribute("datetime")
-                        raw_time_text = time_el.get_attribute("textContent").strip()
-                        
-                        if iso_date:
-                            try:
-                                dt_obj = datetime.fromisoformat(iso_date.replace('Z', '+00:00'))
-                                m_date = dt_obj.strftime("%d.%m")
-                                m_time = dt_obj.strftime("%H:%M")
-                            except: pass
-                        
-                        # Fallback/Override: If time is still missing or we want to be sure
-                        if not m_time or m_time == "00:00":
-                            time_match = re.search(r'(\d{1,2}[:.]\d{2})', raw_time_text)
-                            if time_match:
-                                m_time = time_match.group(1).replace('.', ':')
-                                # Ensure 0 prefix if needed (e.g. 8:35 -> 08:35)
-                                if len(m_time.split(':')[0]) == 1:
-                                    m_time = "0" + m_time
-
-                        # Date fallback
-                        if "Tomorrow" in raw_time_text:
-                            m_date = (datetime.now() + timedelta(days=1)).strftime("%d.%m")
-                        elif "Today" in raw_time_text:
-                            m_date = datetime.now().strftime("%d.%m")
-                        elif not iso_date:
-                            # Look for "DD Mon" pattern
-                            date_match = re.search(r'(\d{2})\s+([A-Za-z]{3})', raw_time_text)
-                            if date_match:
-                                day = date_match.group(1)
-                                m_date = f"{day}.{datetime.now().strftime('%m')}"
-                    except: pass
-                    
-                    # Consensus % and Tip Count
-                    prob = "0"
-                    tip_count = ""
-                    try:
-                        tips_container = row.find_element(By.CSS_SELECTOR, ".rw.tips")
-                        
-                        # Percentage
-                        try:
-                            prob_el = tips_container.find_element(By.CSS_SELECTOR, "span")
-                            prob_txt = prob_el.get_attribute("textContent").strip()
-                            prob_match = re.search(r'(\d+)%', prob_txt)
-                            if prob_match: prob = prob_match.group(1)
-                        except: pass
-                            
-                        # Tip Count (e.g. "52/62 Win Tips")
-                        try:
-                            tip_count_el = tips_container.find_element(By.CSS_SELECTOR, "b")
-                            tip_count_txt = tip_count_el.get_attribute("textContent").strip()
-                            tc_match = re.search(r'(\d+/\d+)', tip_count_txt)
-                            if tc_match: tip_count = tc_match.group(1)
-                        except: pass
-                    except: pass
-                    
-                    # Selection (Tip)
-                    selection = "Unknown"
-                    try:
-                        selection_el = row.find_element(By.CSS_SELECTOR, ".rw.sel h4")
-                        selection = selection_el.get_attribute("textContent").strip()
-                    except: pass
-                    
-                    # Market Name
-                    market_name = "1X2" # Default
-                    try:
-                        market_el = row.find_element(By.CSS_SELECTOR, ".rw.sel p.truncate")
-                        m_txt = market_el.get_attribute("textContent").lower()
-                        if "both teams to score" in m_txt: market_name = "BTTS"
-                        elif "over/under" in m_txt: market_name = "OU25"
-                    except: pass
-                    
-                    # Map selection to our format
-                    pred = selection
-                    if market_name == "1X2":
-                        if selection == home: pred = "1"
-                        elif selection == away: pred = "2"
-                        elif "draw" in selection.lower(): pred = "X"
-                    elif market_name == "BTTS":
-                        pred = "Yes" if "yes" in selection.lower() else "No"
-                    elif market_name == "OU25":
-                        pred = "OVER" if "over" in selection.lower() else "UNDER"
-                        
-                    predictions.append({
-                        "home": home,
-                        "away": away,
-                        "league": league,
-                        "date": m_date,
-                        "time": m_time,
-                        "markets": {
-                            market_name: {
-                                "pred": pred,
-                                "prob": prob,
-                                "tip_count": tip_count
-                            }
-                        },
-                        "timestamp": datetime.now().isoformat()
-                    })
-                except:
-                    continue
-                    
-            self.results["olbg"] = predictions
-            print(f"[CONSENSUS] OLBG: Scraped {len(predictions)} predictions")
+            self.archive.maintain()
         except Exception as e:
-            print(f"[CONSENSUS] OLBG error: {e}")
-        finally:
-            driver.quit()
-
-    def run_all(self):
-        print(f"[CONSENSUS] Starting full run at {datetime.now().isoformat()}")
-        # Execute sequentially with fresh drivers
-        methods = [
-            self.scrape_forebet, 
-            self.scrape_prosoccer,
-            self.scrape_predictz, 
-            self.scrape_windrawwin,
-            self.scrape_statarea,
-            self.scrape_vitibet,
-            self.scrape_zulubet,
-            self.scrape_olbg
-        ]
-        
-        for method in methods:
-            try:
-                method()
-                self.save_results()
-                time.sleep(5) # Cooldown between sites
-            except Exception as e:
-                print(f"[CONSENSUS] Method failed: {e}")
+            print(f"[CONSENSUS] Archive maintenance failed: {e}")
+
+    def run_all(self, workers=None):
+        outcomes = self.run_sites(SCRAPE_ORDER, workers)
+        self.maintain_archive()
+        return outcomes
 
 if __name__ == "__main__":
-    scraper = ConsensusScraper()
-    scraper.run_all()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="parallel browsers (1 = sequential)")
+    parser.add_argument("--reparse", nargs="*", metavar="SITE", help="re-parse saved pages from server/pages instead of scraping")
+    parser.add_argument("--migrate", action="store_true", help=f"upgrade the store to schema v{SCHEMA_VERSION} (seeding it from {OUTPUT_FILE} if empty) and exit")
+    args = parser.parse_args()
+
+    scraper = ConsensusScraper(auto_migrate=not args.migrate)
+    if args.migrate:
+        scraper.migrate()
+        scraper.save_results()
+        raise SystemExit(0)
+    if args.reparse is not None:
+        for site in args.reparse or SCRAPE_ORDER:
+            if os.path.exists(os.path.join(PAGES_DIR, f"{site}.html")):
+                scraper.reparse_saved(site)
+        scraper.save_results()
+        raise SystemExit(0)
+    try:
+        scraper.run_all(workers=args.workers)
+    finally:
+        scraper.pool.close_all()
+        scraper.close_parse_pool()
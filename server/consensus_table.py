@@ -0,0 +1,171 @@
+import os
+import json
+from datetime import datetime
+
+SUMMARY_FILE = "server/consensus_summary.json"
+
+# One vote per (match, market, source); consensus holds the merged row per (match, market)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS consensus_votes (
+    match_key TEXT NOT NULL,
+    market TEXT NOT NULL,
+    source TEXT NOT NULL,
+    pred TEXT,
+    prob TEXT,
+    tip_count TEXT,
+    home TEXT,
+    away TEXT,
+    league TEXT,
+    match_date TEXT,
+    match_time TEXT,
+    PRIMARY KEY (match_key, market, source)
+);
+CREATE INDEX IF NOT EXISTS idx_votes_source ON consensus_votes(source);
+
+CREATE TABLE IF NOT EXISTS consensus (
+    match_key TEXT NOT NULL,
+    market TEXT NOT NULL,
+    max_agreement INTEGER NOT NULL,
+    data TEXT NOT NULL,             -- same shape as consensusAdapter.getAllConsensusSummary rows
+    updated_at TEXT,
+    PRIMARY KEY (match_key, market)
+);
+CREATE INDEX IF NOT EXISTS idx_consensus_market ON consensus(market, max_agreement);
+"""
+
+VOTE_COLUMNS = "source, pred, prob, tip_count, home, away, league, match_date, match_time"
+
+
+def normalize_pred(market, pred):
+    # Same labels as getAllConsensusSummary
+    pred = pred or ""
+    if market == "BTTS":
+        if "yes" in pred.lower() or pred == "1": pred = "KG Var"
+        if "no" in pred.lower() or pred == "0": pred = "KG Yok"
+    if market == "OU25":
+        if "over" in pred.lower() or pred == "O": pred = "Üst"
+        if "under" in pred.lower() or pred == "U": pred = "Alt"
+    return pred
+
+def _messy_league(league):
+    return not league or "adsbygoogle" in league or "<script" in league
+
+def _as_number(prob):
+    try:
+        return float(str(prob).strip().rstrip("%"))
+    except (TypeError, ValueError):
+        return None
+
+def merge_votes(market, votes):
+    # votes: rows of VOTE_COLUMNS in source order
+    first = votes[0]
+    row = {
+        "match": f"{first[4]} vs {first[5]}",
+        "home": first[4],
+        "away": first[5],
+        "league": "Others",
+        "predictions": {},
+        "agreement": {},
+        "probabilities": {},
+        "tipCounts": {},
+        "totalSources": 0,
+        "divergence": 0,
+        "meanProb": None,
+        "market": market,
+        "date": None,
+        "time": None,
+    }
+    probs = []
+    for source, pred, prob, tip_count, home, away, league, match_date, match_time in votes:
+        if row["league"] == "Others" and not _messy_league(league):
+            row["league"] = league
+        row["date"] = row["date"] or match_date or None
+        row["time"] = row["time"] or match_time or None
+        pred = normalize_pred(market, pred)
+        row["predictions"][source] = pred
+        row["agreement"][pred] = row["agreement"].get(pred, 0) + 1
+        if prob and prob != "0":
+            row["probabilities"][source] = prob
+            if _as_number(prob) is not None:
+                probs.append(_as_number(prob))
+        if tip_count:
+            row["tipCounts"][source] = tip_count
+    row["totalSources"] = len(row["predictions"])
+    unique = len(row["agreement"])
+    row["divergence"] = unique / row["totalSources"] * 100 if unique > 1 else 0
+    if probs:
+        row["meanProb"] = round(sum(probs) / len(probs), 1)
+    return row
+
+
+# Cross-source consensus kept next to the predictions in the store. A site refresh only
+# recomputes the (match, market) rows that site voted on before or votes on now.
+class ConsensusTable:
+    def __init__(self, store):
+        self.store = store
+        with store._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def update_site(self, site, predictions):
+        conn = self.store._conn()
+        votes = {}
+        for m in predictions:
+            key = m.get("match_key")
+            if not key:
+                continue
+            for market, data in (m.get("markets") or {}).items():
+                # Probabilities we derived ourselves (markets.py, prob_src) are not the source's own,
+                # they stay out of probabilities/meanProb
+                prob = None if data.get("prob_src") else data.get("prob")
+                # A site listing the same match twice counts once, first listing wins
+                votes.setdefault((key, market), (
+                    key, market, site, data.get("pred"), prob, data.get("tip_count"),
+                    (m.get("home") or "").strip(), (m.get("away") or "").strip(), m.get("league"),
+                    m.get("date"), m.get("time")))
+
+        with conn:
+            touched = {r[0] for r in conn.execute("SELECT DISTINCT match_key FROM consensus_votes WHERE source = ?", (site,))}
+            touched.update(key for key, _ in votes)
+            conn.execute("DELETE FROM consensus_votes WHERE source = ?", (site,))
+            conn.executemany(
+                f"INSERT INTO consensus_votes (match_key, market, {VOTE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                list(votes.values()))
+            self._recompute(conn, touched)
+        return len(touched)
+
+    def _recompute(self, conn, keys):
+        now = datetime.now().isoformat()
+        for key in keys:
+            by_market = {}
+            for market, *vote in conn.execute(
+                    f"SELECT market, {VOTE_COLUMNS} FROM consensus_votes WHERE match_key = ? ORDER BY rowid", (key,)):
+                by_market.setdefault(market, []).append(vote)
+            conn.execute("DELETE FROM consensus WHERE match_key = ?", (key,))
+            conn.executemany(
+                "INSERT INTO consensus (match_key, market, max_agreement, data, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(key, market, max(row["agreement"].values()), json.dumps(dict(row, matchKey=key), ensure_ascii=False), now)
+                 for market, row in ((market, merge_votes(market, v)) for market, v in by_market.items())])
+
+    def rebuild(self):
+        # Full rebuild from the stored predictions (migration / repair)
+        with self.store._conn() as conn:
+            conn.execute("DELETE FROM consensus_votes")
+            conn.execute("DELETE FROM consensus")
+        for site in self.store.sources():
+            self.update_site(site, self.store.load_site(site))
+
+    def rows(self, market):
+        cur = self.store._conn().execute(
+            "SELECT data FROM consensus WHERE market = ? ORDER BY max_agreement DESC, rowid", (market,))
+        return [json.loads(r[0]) for r in cur]
+
+    def markets(self):
+        return [r[0] for r in self.store._conn().execute("SELECT DISTINCT market FROM consensus ORDER BY market")]
+
+    def export_json(self, path=SUMMARY_FILE):
+        data = {market: self.rows(market) for market in self.markets()}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return data
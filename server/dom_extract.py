@@ -0,0 +1,215 @@
+# Bulk DOM extraction: one execute_script per page instead of several WebDriver
+# round-trips per row. A "row spec" describes what to pull for every row:
+#
+#   {
+#       "rows": "css selector for rows",
+#       "cells": True,                      # direct <td> children -> [{"text": ...}]
+#       "row_text": "textContent",          # or "innerText", omit to skip
+#       "fields": {                         # first match inside the row (css may be a list, tried in order)
+#           "name": {"css": ".sel", "attrs": ["title"], "inner": False, "all": False}
+#       },
+#       "header": {"css": "div.league", "inner_css": "h2"}   # nearest preceding sibling matching css
+#   }
+#
+# Every row comes back as {"cls", "text", "cells", "fields", "header", "prev"} with plain Python values.
+#
+# The same spec runs either inside the live page (extract_rows, one execute_script) or offline on a
+# saved page_source (extract_rows_html, lxml + cssselect), so site parsers don't care where rows came from.
+
+import re
+
+try:
+    import lxml.html
+    from cssselect import SelectorError
+    HAVE_LXML = True
+except ImportError:
+    HAVE_LXML = False
+
+EXTRACT_JS = """
+var spec = arguments[0];
+var fields = spec.fields || {};
+var names = Object.keys(fields);
+var headerOf = new Map();
+
+function read(node, f) {
+    var out = {text: f.inner ? node.innerText : node.textContent};
+    if (f.attrs) {
+        out.attrs = {};
+        f.attrs.forEach(function (a) { out.attrs[a] = node.getAttribute(a); });
+    }
+    return out;
+}
+
+function pick(row, f) {
+    var sels = Array.isArray(f.css) ? f.css : [f.css];
+    for (var i = 0; i < sels.length; i++) {
+        if (f.all) {
+            var list = row.querySelectorAll(sels[i]);
+            if (list.length) return Array.prototype.map.call(list, function (n) { return read(n, f); });
+        } else {
+            var node = row.querySelector(sels[i]);
+            if (node) return read(node, f);
+        }
+    }
+    return null;
+}
+
+function header(row) {
+    // Walk back to the nearest header; stop early at a row we already resolved (keeps the pass linear)
+    for (var p = row.previousElementSibling; p; p = p.previousElementSibling) {
+        if (headerOf.has(p)) return headerOf.get(p);
+        if (p.matches(spec.header.css)) {
+            var inner = spec.header.inner_css ? p.querySelector(spec.header.inner_css) : p;
+            return inner ? inner.innerText : null;
+        }
+    }
+    return null;
+}
+
+var rows = document.querySelectorAll(spec.rows);
+var out = [];
+for (var r = 0; r < rows.length; r++) {
+    var row = rows[r];
+    var item = {cls: row.getAttribute('class') || '', fields: {}};
+    if (spec.row_text) item.text = row[spec.row_text];
+    if (spec.cells) {
+        item.cells = [];
+        for (var c = 0; c < row.children.length; c++) {
+            if (row.children[c].tagName === 'TD') item.cells.push({text: row.children[c].textContent});
+        }
+    }
+    for (var n = 0; n < names.length; n++) item.fields[names[n]] = pick(row, fields[names[n]]);
+    if (spec.header) {
+        item.header = header(row);
+        headerOf.set(row, item.header);
+        item.prev = row.previousElementSibling ? row.previousElementSibling.innerText : null;
+    }
+    out.push(item);
+}
+return out;
+"""
+
+
+def extract_rows(driver, spec):
+    return driver.execute_script(EXTRACT_JS, spec) or []
+
+
+# --- Offline extraction from saved HTML ---
+
+BLOCK_TAGS = {"address", "article", "aside", "blockquote", "dd", "div", "dl", "dt", "fieldset", "figcaption",
+              "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main",
+              "nav", "ol", "p", "pre", "section", "table", "tbody", "tfoot", "thead", "tr", "ul"}
+SKIP_TEXT_TAGS = {"script", "style", "noscript", "template", "head"}
+
+def _walk_text(node, parts, tail=True):
+    tag = node.tag if isinstance(node.tag, str) else None   # comments / PIs have no text of their own
+    if tag is not None and tag not in SKIP_TEXT_TAGS:
+        if tag == "br":
+            parts.append("\n")
+        elif tag in BLOCK_TAGS:
+            parts.append("\n")
+        if node.text:
+            parts.append(node.text)
+        for child in node:
+            _walk_text(child, parts)
+        if tag in BLOCK_TAGS:
+            parts.append("\n")
+        elif tag in ("td", "th"):
+            parts.append(" ")
+    if tail and node.tail:
+        parts.append(node.tail)
+
+def inner_text(el):
+    # Close enough to the browser's innerText: block elements break lines, whitespace collapses
+    parts = []
+    _walk_text(el, parts, tail=False)
+    lines = (re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+def _read_html(node, f):
+    out = {"text": inner_text(node) if f.get("inner") else node.text_content()}
+    if f.get("attrs"):
+        out["attrs"] = {a: node.get(a) for a in f["attrs"]}
+    return out
+
+def _pick_html(row, f):
+    sels = f["css"] if isinstance(f["css"], list) else [f["css"]]
+    for sel in sels:
+        found = row.cssselect(sel)
+        if not found:
+            continue
+        if f.get("all"):
+            return [_read_html(n, f) for n in found]
+        return _read_html(found[0], f)
+    return None
+
+def _prev_element(el):
+    p = el.getprevious()
+    while p is not None and not isinstance(p.tag, str):
+        p = p.getprevious()
+    return p
+
+def parse_html(html):
+    # Accepts page_source (str) or the raw bytes of a saved page
+    return lxml.html.fromstring(html)
+
+def extract_rows_html(html, spec):
+    if not HAVE_LXML:
+        raise RuntimeError("lxml/cssselect not installed, offline parsing unavailable")
+    doc = parse_html(html) if isinstance(html, (str, bytes)) else html
+    fields = spec.get("fields") or {}
+    headers = set(doc.cssselect(spec["header"]["css"])) if spec.get("header") else set()
+    header_of = {}
+
+    def header(row):
+        p = _prev_element(row)
+        while p is not None:
+            if p in header_of:
+                return header_of[p]
+            if p in headers:
+                inner_css = spec["header"].get("inner_css")
+                inner = p.cssselect(inner_css) if inner_css else [p]
+                return inner_text(inner[0]) if inner else None
+            p = _prev_element(p)
+        return None
+
+    out = []
+    for row in doc.cssselect(spec["rows"]):
+        item = {"cls": row.get("class") or "", "fields": {}}
+        if spec.get("row_text"):
+            item["text"] = inner_text(row) if spec["row_text"] == "innerText" else row.text_content()
+        if spec.get("cells"):
+            item["cells"] = [{"text": c.text_content()} for c in row if c.tag == "td"]
+        for name, f in fields.items():
+            try:
+                item["fields"][name] = _pick_html(row, f)
+            except SelectorError:
+                item["fields"][name] = None
+        if spec.get("header"):
+            item["header"] = header(row)
+            header_of[row] = item["header"]
+            prev = _prev_element(row)
+            item["prev"] = inner_text(prev) if prev is not None else None
+        out.append(item)
+    return out
+
+
+# --- Helpers for parsers working on extracted rows ---
+
+def field(row, name):
+    return (row.get("fields") or {}).get(name)
+
+def field_text(row, name, default=None):
+    f = field(row, name)
+    if not f or f.get("text") is None:
+        return default
+    return f["text"].strip()
+
+def field_attr(row, name, attr):
+    f = field(row, name)
+    if not f:
+        return None
+    return (f.get("attrs") or {}).get(attr)
+
+def cell_texts(row):
+    return [(c.get("text") or "").strip() for c in row.get("cells") or []]
@@ -0,0 +1,141 @@
+import os
+import time
+import atexit
+import threading
+import undetected_chromedriver as uc
+
+# Recycle a browser after this many sites (memory creep, stale anti-bot state)
+MAX_USES = int(os.environ.get("DRIVER_MAX_USES", "20"))
+
+# Storage wiped between sites. The HTTP cache is kept on purpose, that is the warm part.
+CLEAR_STORAGE_TYPES = "cookies,local_storage,session_storage,indexeddb,websql,service_workers,cache_storage"
+
+
+class PooledDriver:
+    def __init__(self, driver, profile):
+        self.driver = driver
+        self.profile = profile
+        self.uses = 0
+        self.created = time.time()
+
+
+# Warm undetected_chromedriver sessions keyed by (use_mobile, headless)
+class DriverPool:
+    def __init__(self, max_uses=MAX_USES):
+        self.max_uses = max_uses
+        self._idle = {}    # profile -> [PooledDriver]
+        self._busy = {}    # id(driver) -> PooledDriver
+        self._lock = threading.Lock()
+        # uc patches the chromedriver binary on launch, concurrent launches race on that file
+        self._launch_lock = threading.Lock()
+        atexit.register(self.close_all)
+
+    def _launch(self, use_mobile, headless):
+        options = uc.ChromeOptions()
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--disable-gpu')
+        options.add_argument('--window-position=-2000,0') # Open off-screen
+
+        if use_mobile:
+            options.add_argument('--window-size=375,812')
+        else:
+            options.add_argument('--window-size=1920,1080')
+
+        with self._launch_lock:
+            try:
+                driver = uc.Chrome(options=options, headless=headless)
+                if not headless:
+                    driver.minimize_window()
+                return driver
+            except Exception as e:
+                print(f"[DRIVER_POOL] Driver failed: {e}")
+                return uc.Chrome(headless=True)
+
+    def _alive(self, driver):
+        try:
+            driver.current_window_handle
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, entry):
+        try:
+            entry.driver.quit()
+        except Exception:
+            pass
+
+    def _reset(self, driver):
+        # Wipe state left by the previous site, then continue in a fresh tab
+        try:
+            origin = driver.execute_script("return window.location.origin;")
+            if origin and origin.startswith("http"):
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": CLEAR_STORAGE_TYPES})
+        except Exception:
+            pass
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+
+        old_handles = driver.window_handles
+        driver.switch_to.new_window('tab')
+        fresh = driver.current_window_handle
+        for handle in old_handles:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(fresh)
+
+    def acquire(self, use_mobile=False, headless=True):
+        profile = (use_mobile, headless)
+        while True:
+            with self._lock:
+                idle = self._idle.get(profile, [])
+                entry = idle.pop() if idle else None
+            if entry is None:
+                break
+            if self._alive(entry.driver):
+                break
+            print(f"[DRIVER_POOL] Dropping dead session {profile}")
+            self._quit(entry)
+
+        if entry is None:
+            print(f"[DRIVER_POOL] Launching new session {profile}")
+            entry = PooledDriver(self._launch(use_mobile, headless), profile)
+
+        with self._lock:
+            self._busy[id(entry.driver)] = entry
+        return entry.driver
+
+    def release(self, driver):
+        with self._lock:
+            entry = self._busy.pop(id(driver), None)
+        if entry is None:
+            # Not ours, behave like the old driver.quit()
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            return
+
+        entry.uses += 1
+        if entry.uses >= self.max_uses:
+            print(f"[DRIVER_POOL] Recycling session {entry.profile} after {entry.uses} uses")
+            self._quit(entry)
+            return
+
+        try:
+            self._reset(driver)
+        except Exception as e:
+            # Crashed tab/renderer: never hand this session out again
+            print(f"[DRIVER_POOL] Session {entry.profile} unhealthy, recycling: {e}")
+            self._quit(entry)
+            return
+
+        with self._lock:
+            self._idle.setdefault(entry.profile, []).append(entry)
+
+    def close_all(self):
+        with self._lock:
+            entries = [e for idle in self._idle.values() for e in idle] + list(self._busy.values())
+            self._idle = {}
+            self._busy = {}
+        for entry in entries:
+            self._quit(entry)
@@ -0,0 +1,123 @@
+import os
+import re
+import json
+import time
+import zlib
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Captured SofaScore event payloads (details + statistics), one compressed row per event and kind.
+# Replaces the ever-growing server/stats/{id}_detail.json / {id}_stats.json files.
+EVENTS_DB = 'server/events.db'
+LEGACY_STATS_DIR = 'server/stats'
+
+# Finished matches are kept this long after their last update, anything else this long
+FINISHED_RETENTION = 48 * 3600
+STALE_RETENTION = 7 * 24 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    event_id TEXT NOT NULL,
+    kind TEXT NOT NULL,             -- 'detail' | 'stats'
+    payload BLOB NOT NULL,          -- zlib-compressed JSON
+    error INTEGER NOT NULL DEFAULT 0,
+    finished INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (event_id, kind)
+);
+CREATE INDEX IF NOT EXISTS idx_events_updated ON events(updated_at);
+"""
+
+# Numeric event ids only: the directory also holds boost_/featured_/votes_ list dumps that are not events
+LEGACY_FILE = re.compile(r"^(\d+)_(detail|stats)\.json$")
+
+
+def is_finished(data):
+    try:
+        return data["event"]["status"]["type"] == "finished"
+    except (KeyError, TypeError):
+        return False
+
+
+class EventStore:
+    def __init__(self, path=EVENTS_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")   # only takes effect on a new file
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+        # (event_id, kind) -> updated_at; lookups for unknown events never touch the database
+        self.index = {(e, k): u for e, k, u in self.conn.execute("SELECT event_id, kind, updated_at FROM events")}
+        self.finished = {e for (e,) in self.conn.execute("SELECT DISTINCT event_id FROM events WHERE finished = 1")}
+
+    def put(self, event_id, kind, data, updated_at=None):
+        event_id = str(event_id)
+        updated_at = updated_at or time.time()
+        if kind == "detail" and is_finished(data):
+            self.finished.add(event_id)
+        payload = zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+        error = isinstance(data, dict) and "error" in data
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO events (event_id, kind, payload, error, finished, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (event_id, kind, payload, int(error), int(event_id in self.finished), updated_at))
+            if event_id in self.finished:
+                self.conn.execute("UPDATE events SET finished = 1 WHERE event_id = ?", (event_id,))
+            self.index[(event_id, kind)] = updated_at
+
+    def get(self, event_id, kind):
+        # (data, updated_at) or None
+        key = (str(event_id), kind)
+        if key not in self.index:
+            return None
+        with self._lock:
+            row = self.conn.execute("SELECT payload, updated_at FROM events WHERE event_id = ? AND kind = ?", key).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0])), row[1]
+
+    def __len__(self):
+        return len(self.index)
+
+    def expire(self):
+        now = time.time()
+        with self._lock, self.conn:
+            cur = self.conn.execute(
+                "DELETE FROM events WHERE (finished = 1 AND updated_at < ?) OR updated_at < ?",
+                (now - FINISHED_RETENTION, now - STALE_RETENTION))
+            removed = cur.rowcount
+        if removed:
+            with self._lock:
+                self.conn.execute("PRAGMA incremental_vacuum")
+                self.index = {(e, k): u for e, k, u in self.conn.execute("SELECT event_id, kind, updated_at FROM events")}
+                self.finished &= {e for e, _ in self.index}
+            logger.info(f"Event store: expired {removed} payloads, {len(self.index)} left")
+        return removed
+
+    def migrate_legacy_files(self, directory=LEGACY_STATS_DIR):
+        # One-time move of the loose per-match files into the store; files are removed once stored
+        if not os.path.isdir(directory):
+            return 0
+        moved = 0
+        for name in os.listdir(directory):
+            m = LEGACY_FILE.match(name)
+            if not m:
+                continue
+            path = os.path.join(directory, name)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.put(m.group(1), m.group(2), data, updated_at=os.path.getmtime(path))
+                os.remove(path)
+                moved += 1
+            except Exception as e:
+                logger.warning(f"Could not migrate {path}: {e}")
+        if moved:
+            logger.info(f"Event store: migrated {moved} files from {directory}")
+        return moved
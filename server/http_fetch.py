@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import threading
+from urllib.parse import urlsplit
+import urllib3
+
+# Which path last worked for each site ("http" or "browser")
+FETCH_PATHS_FILE = "server/fetch_paths.json"
+
+# A site stuck on the browser path gets another HTTP try after this long
+RETRY_HTTP_AFTER = 24 * 3600
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Server-rendered sources worth trying without Chrome.
+# markers: all must be in the body; blockers: any of them means a challenge/consent page.
+HTTP_SOURCES = {
+    "prosoccer": {
+        "url": "https://www.prosoccer.gr/en/football/predictions/",
+        "markers": ["tblPredictions", "<td"],
+    },
+    "vitibet": {
+        "url": "https://www.vitibet.com/index.php?clanek=quicktips&sekce=fotbal&lang=en",
+        "markers": ["odseknutiligy", "<td"],
+    },
+    "zulubet": {
+        "url": "https://www.zulubet.com/",
+        "markers": ["content_table", "<td"],
+    },
+}
+BLOCKERS = ["cf-chl", "challenge-platform", "Just a moment...", "Bir dakika lütfen"]
+
+
+class HttpFetcher:
+    def __init__(self, paths_file=FETCH_PATHS_FILE, timeout=15):
+        self.paths_file = paths_file
+        # One keep-alive pool per host, gzip/deflate decoded by urllib3
+        self.http = urllib3.PoolManager(
+            num_pools=16,
+            maxsize=4,
+            headers={
+                "User-Agent": USER_AGENT,
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                "Accept-Language": "en-US,en;q=0.9",
+                "Accept-Encoding": "gzip, deflate",
+            },
+            timeout=urllib3.Timeout(connect=5, read=timeout),
+            retries=urllib3.Retry(total=2, backoff_factor=0.5, status_forcelist=[502, 503, 504], redirect=5),
+        )
+        self._cookies = {}   # host -> {name: value}, a minimal per-host session
+        self._lock = threading.Lock()
+        self.paths = {}
+        if os.path.exists(paths_file):
+            try:
+                with open(paths_file, 'r', encoding='utf-8') as f:
+                    self.paths = json.load(f)
+            except Exception as e:
+                print(f"[HTTP_FETCH] Could not load {paths_file}: {e}")
+
+    def get(self, url):
+        host = urlsplit(url).netloc
+        headers = {}
+        with self._lock:
+            jar = dict(self._cookies.get(host, {}))
+        if jar:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in jar.items())
+
+        response = self.http.request("GET", url, headers=headers, preload_content=True)
+
+        set_cookies = response.headers.getlist("Set-Cookie") if hasattr(response.headers, "getlist") else []
+        if set_cookies:
+            with self._lock:
+                jar = self._cookies.setdefault(host, {})
+                for raw in set_cookies:
+                    name, _, rest = raw.partition("=")
+                    jar[name.strip()] = rest.split(";", 1)[0].strip()
+        return response.status, response.data
+
+    def should_try(self, site):
+        if site not in HTTP_SOURCES:
+            return False
+        entry = self.paths.get(site)
+        if not entry or entry.get("path") == "http":
+            return True
+        return time.time() - entry.get("checked", 0) > RETRY_HTTP_AFTER
+
+    def remember(self, site, path):
+        with self._lock:
+            self.paths[site] = {"path": path, "checked": time.time()}
+            try:
+                with open(self.paths_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.paths, f, indent=2)
+            except Exception as e:
+                print(f"[HTTP_FETCH] Could not save {self.paths_file}: {e}")
+
+    def fetch_page(self, site):
+        # Raw HTML bytes when the plain HTTP response looks like the real page, else None
+        source = HTTP_SOURCES[site]
+        started = time.time()
+        try:
+            status, body = self.get(source["url"])
+        except Exception as e:
+            print(f"[HTTP_FETCH] {site}: request failed: {e}")
+            return None
+
+        text = body.decode("utf-8", errors="ignore")
+        if status != 200:
+            print(f"[HTTP_FETCH] {site}: HTTP {status}, falling back to browser")
+            return None
+        if any(b in text for b in BLOCKERS) or not all(m in text for m in source["markers"]):
+            print(f"[HTTP_FETCH] {site}: response has no prediction markup, falling back to browser")
+            return None
+
+        print(f"[HTTP_FETCH] {site}: {len(body) // 1024} KB over HTTP in {time.time() - started:.1f}s")
+        return body
+
+    def close(self):
+        self.http.clear()
@@ -0,0 +1,81 @@
+import time
+import hashlib
+import threading
+from collections import deque
+
+# How many per-event deltas are kept for "changes since version N"
+CHANGE_HISTORY = 2000
+
+
+def event_state(event):
+    # The fields consumers react to; anything else changing in the list is not a delta
+    status = event.get("status") or {}
+    status_time = event.get("statusTime") or event.get("time") or {}
+    return {
+        "home": (event.get("homeTeam") or {}).get("name"),
+        "away": (event.get("awayTeam") or {}).get("name"),
+        "score": [(event.get("homeScore") or {}).get("current"), (event.get("awayScore") or {}).get("current")],
+        "status": status.get("type"),
+        "description": status.get("description"),
+        # Minute the way sofaScoreAdapter.calculateMinute derives it (period start + initial offset)
+        "minute": int((time.time() - status_time["timestamp"] + status_time.get("initial", 0)) // 60)
+                  if status.get("type") == "inprogress" and status_time.get("timestamp") else None,
+        "cards": [event.get("homeRedCards", 0), event.get("awayRedCards", 0)],
+    }
+
+
+# Diffs each captured live list against the previous one. Every per-event delta gets its own
+# version number, so a client that saw version N only needs since(N).
+class LiveFeed:
+    def __init__(self, history=CHANGE_HISTORY):
+        # A restarted scraper starts a new epoch; clients holding versions of an older one must resync
+        self.epoch = int(time.time())
+        self.version = 0
+        self.states = {}
+        self.changes = deque(maxlen=history)
+        self.body_hash = None
+        self._lock = threading.Lock()
+
+    def changed_body(self, body):
+        # Cheap check before any diffing: identical bytes means nothing to write or compare
+        digest = hashlib.sha1(body.encode('utf-8') if isinstance(body, str) else body).hexdigest()
+        if digest == self.body_hash:
+            return False
+        self.body_hash = digest
+        return True
+
+    def update(self, data):
+        now = time.time()
+        current = {}
+        for event in data.get("events") or []:
+            if event.get("id") is not None:
+                current[str(event["id"])] = event_state(event)
+
+        deltas = []
+        with self._lock:
+            for event_id, state in current.items():
+                old = self.states.get(event_id)
+                if old is None:
+                    deltas.append({"id": event_id, "type": "added", "fields": state})
+                    continue
+                fields = {k: v for k, v in state.items() if old.get(k) != v}
+                if fields:
+                    deltas.append({"id": event_id, "type": "changed", "fields": fields})
+            for event_id in self.states.keys() - current.keys():
+                deltas.append({"id": event_id, "type": "removed", "fields": {}})
+            for delta in deltas:
+                self.version += 1
+                delta["version"] = self.version
+                delta["ts"] = now
+                self.changes.append(delta)
+            self.states = current
+        return deltas
+
+    def since(self, version, epoch=None):
+        with self._lock:
+            oldest = self.changes[0]["version"] if self.changes else self.version + 1
+            if (epoch is not None and epoch != self.epoch) or version > self.version or version + 1 < oldest:
+                # History doesn't reach back that far (or a different process): full resync needed
+                return {"epoch": self.epoch, "version": self.version, "reset": True, "changes": []}
+            return {"epoch": self.epoch, "version": self.version, "reset": False,
+                    "changes": [c for c in self.changes if c["version"] > version]}
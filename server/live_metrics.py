@@ -0,0 +1,95 @@
+import time
+import threading
+import numpy as np
+from stats_table import SIDES
+from stats_series import SERIES_COLUMNS
+
+# Batch versions of the client's per-fixture modules, computed for every tracked match at once
+# from the StatsTable (current values) and the SeriesStore (values ~10 minutes ago).
+
+# pressureIndex.js: shots on target, dangerous attacks, corners
+PRESSURE_WEIGHTS = np.array([15, 1.5, 5], dtype=np.float32)
+# xGModule.js fallback: shots on target, dangerous attacks, big chances
+XG_WEIGHTS = np.array([0.15, 0.02, 0.45], dtype=np.float32)
+# velocityModule.js: compare against the snapshot from this long ago
+VELOCITY_WINDOW = 10 * 60
+# (minimum change in SOG + corners, trend, score, description), checked in order
+VELOCITY_TRENDS = [
+    (3, 'HOT', 1.4, 'Vites Yükseldi'),
+    (1, 'WARMING', 1.2, 'Hareketlenme Var'),
+]
+
+TABLE_KEYS = ["shotsOnGoal", "cornerKicks", "bigChanceCreated", "finalThirdEntries", "expectedGoals"]
+SOG, CORNERS, BIG_CHANCES, FINAL_THIRD, XG = range(len(TABLE_KEYS))
+VELOCITY_COLUMNS = [SERIES_COLUMNS.index(f"{name}_{side}") for name in ("shots_on_goal", "corners") for side in SIDES]
+
+
+def js_round(x, decimals=0):
+    # Math.round / toFixed round halves up; np.round rounds them to even
+    scale = 10 ** decimals
+    return np.floor(x * scale + 0.5) / scale
+
+
+def compute(ids, values, latest, past, counts):
+    # values: StatsTable.select(TABLE_KEYS) -> [n, key, home/away]; latest/past/counts: SeriesStore.window()
+    stats = np.nan_to_num(values)
+    # No "dangerous attacks" on SofaScore: sofaScoreAdapter falls back to big chances
+    # (they come first in the payload) and to final third entries while the home side has none
+    dangerous = np.where(stats[:, BIG_CHANCES, :1] > 0, stats[:, BIG_CHANCES], stats[:, FINAL_THIRD])
+
+    side_pressure = (stats[:, SOG] * PRESSURE_WEIGHTS[0] + dangerous * PRESSURE_WEIGHTS[1]
+                     + stats[:, CORNERS] * PRESSURE_WEIGHTS[2])
+    pressure = np.minimum(100, js_round(side_pressure))
+    pressure_total = np.minimum(100, js_round(side_pressure.sum(axis=1)))
+
+    fallback_xg = js_round(stats[:, SOG] * XG_WEIGHTS[0] + dangerous * XG_WEIGHTS[1]
+                           + stats[:, BIG_CHANCES] * XG_WEIGHTS[2], 2)
+    has_xg = ~np.isnan(values[:, XG]).any(axis=1)
+    xg = np.where(has_xg[:, None], stats[:, XG], fallback_xg)
+
+    change = (np.nan_to_num(latest[:, VELOCITY_COLUMNS]).sum(axis=1)
+              - np.nan_to_num(past[:, VELOCITY_COLUMNS]).sum(axis=1))
+
+    metrics = {}
+    for i, match_id in enumerate(ids):
+        if counts[i] < 2:
+            velocity = {"trend": "NEUTRAL", "score": 1.0}
+        elif change[i] < 0:
+            velocity = {"trend": "COOLING", "score": 0.8, "description": "Oyun Yavaşladı"}
+        else:
+            velocity = {"trend": "STABLE", "score": 1.0, "description": "Ritim Aynı"}
+            for minimum, trend, score, description in VELOCITY_TRENDS:
+                if change[i] >= minimum:
+                    velocity = {"trend": trend, "score": score, "description": description}
+                    break
+        metrics[match_id] = {
+            "pressure": {"home": int(pressure[i, 0]), "away": int(pressure[i, 1]), "total": int(pressure_total[i])},
+            "xg": {"home": round(float(xg[i, 0]), 2), "away": round(float(xg[i, 1]), 2),
+                   "source": "PRIMARY_DATA" if has_xg[i] else "FALLBACK_CALC"},
+            "dangerousAttacks": {"home": float(dangerous[i, 0]), "away": float(dangerous[i, 1])},
+            "velocity": velocity,
+        }
+    return metrics
+
+
+class LiveMetrics:
+    def __init__(self):
+        self.dirty = False
+        self.metrics = {}
+        self.computed_at = 0
+        self._lock = threading.Lock()
+
+    def mark_dirty(self):
+        # A stats snapshot landed or a match left the live list
+        self.dirty = True
+
+    def refresh(self, table, series, now=None):
+        # One vectorised pass over every tracked match; returns the payload published to the cache
+        now = now or time.time()
+        with self._lock:
+            self.dirty = False
+            ids, values = table.select(TABLE_KEYS)
+            latest, past, counts = series.window(ids, VELOCITY_WINDOW, now)
+            self.metrics = compute(ids, values, latest, past, counts)
+            self.computed_at = now
+            return {"computedAt": now, "matches": self.metrics}
@@ -0,0 +1,119 @@
+import time
+import threading
+from collections import deque
+from datetime import datetime
+
+# Live-list poll interval bounds (seconds)
+MIN_INTERVAL = 10
+MAX_INTERVAL = 120
+
+# Minutes of a match where state flips quickly: kick-off, half-time, full-time
+HOT_MINUTES = [(0, 5), (42, 50), (85, 200)]
+
+# Most fixtures kick off on these minutes past the hour; poll faster within KICKOFF_SLACK of them
+KICKOFF_SLOTS = (0, 30)
+KICKOFF_SLACK = 2
+
+# Page refresh: only when the capture looks unhealthy, never more often than this
+REFRESH_COOLDOWN = 120
+FAILED_BATCHES_BEFORE_REFRESH = 3
+
+
+# Decides when capture_sofascore polls the live list and when the page needs a refresh,
+# from what the captures themselves show: how many events are live and how fast they change.
+class LiveScheduler:
+    def __init__(self):
+        self.interval = 30
+        self.last_fetch = 0
+        self.last_capture = time.time()
+        self.last_refresh = time.time()
+        self.live_count = 0
+        self.hot_count = 0
+        self.recent = deque(maxlen=6)   # significant (non-minute) deltas of the last captures
+        self.failed_batches = 0
+        self._lock = threading.Lock()
+
+    def record_live(self, data, deltas):
+        # Called with every captured live list (and its deltas from LiveFeed)
+        now = time.time()
+        live = hot = 0
+        for event in data.get("events") or []:
+            status = event.get("status") or {}
+            if status.get("type") != "inprogress":
+                continue
+            live += 1
+            status_time = event.get("statusTime") or event.get("time") or {}
+            if status_time.get("timestamp"):
+                minute = (now - status_time["timestamp"] + status_time.get("initial", 0)) / 60
+                if any(lo <= minute <= hi for lo, hi in HOT_MINUTES):
+                    hot += 1
+            elif "half" in (status.get("description") or "").lower():
+                hot += 1
+        significant = sum(1 for d in deltas if d["type"] != "changed" or set(d["fields"]) - {"minute"})
+        with self._lock:
+            self.last_capture = now
+            self.live_count = live
+            self.hot_count = hot
+            self.recent.append(significant)
+            self.interval = self._next_interval(now)
+
+    def record_unchanged(self):
+        # A live list arrived that was byte-identical to the previous one
+        now = time.time()
+        with self._lock:
+            self.last_capture = now
+            self.recent.append(0)
+            self.interval = self._next_interval(now)
+
+    def _next_interval(self, now):
+        if self.live_count == 0:
+            # Nothing live: back off gradually, but wake up for the next kick-off slot
+            if self._near_kickoff_slot(now):
+                return 30
+            return min(MAX_INTERVAL, self.interval * 1.5)
+        # More live events and more changes per poll -> shorter interval
+        interval = 30 if self.live_count < 20 else 20 if self.live_count < 100 else 15
+        change_rate = sum(self.recent) / len(self.recent) if self.recent else 0
+        if change_rate >= 3:
+            interval = min(interval, 12)
+        elif change_rate == 0 and len(self.recent) == self.recent.maxlen:
+            interval *= 1.5
+        if self.hot_count or self._near_kickoff_slot(now):
+            interval = MIN_INTERVAL
+        return max(MIN_INTERVAL, min(MAX_INTERVAL, interval))
+
+    def _near_kickoff_slot(self, now):
+        minute = datetime.fromtimestamp(now).minute
+        return any(abs(minute - slot) <= KICKOFF_SLACK or abs(minute - slot - 60) <= KICKOFF_SLACK for slot in KICKOFF_SLOTS)
+
+    def live_due(self, now):
+        return now - self.last_fetch >= self.interval
+
+    def live_fetched(self, now):
+        self.last_fetch = now
+
+    def record_batch(self, requested, failed):
+        with self._lock:
+            self.failed_batches = self.failed_batches + 1 if requested and failed == requested else 0
+
+    def refresh_reason(self, now):
+        # Why the page should be refreshed now, or None while it looks healthy
+        if now - self.last_refresh < REFRESH_COOLDOWN:
+            return None
+        grace = max(90, 3 * self.interval)
+        if self.last_fetch > self.last_capture and now - self.last_capture > grace:
+            return f"no live list captured for {int(now - self.last_capture)}s"
+        if self.failed_batches >= FAILED_BATCHES_BEFORE_REFRESH:
+            return f"{self.failed_batches} targeted batches failed in a row"
+        return None
+
+    def refreshed(self, now):
+        with self._lock:
+            self.last_refresh = now
+            self.last_capture = now
+            self.failed_batches = 0
+
+    def tick(self, now):
+        # Loop sleep: short while live so queue work and due polls are picked up, longer when idle
+        until_due = max(0.5, self.interval - (now - self.last_fetch))
+        return min(until_due, 2 if self.live_count else 5)
@@ -0,0 +1,82 @@
+import re
+import json
+import threading
+from urllib.parse import parse_qsl
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Loopback-only API of the SofaScore scraper process, used by proxy.js
+LOCAL_API_HOST = '127.0.0.1'
+LOCAL_API_PORT = 3002
+
+
+class LocalApi:
+    def __init__(self, host=LOCAL_API_HOST, port=LOCAL_API_PORT):
+        self.host = host
+        self.port = port
+        # (method, compiled pattern, handler(match, body, headers) -> (status, payload[, headers]))
+        # body is the parsed JSON body, or the query string as a dict for GET requests
+        self.routes = []
+        self.server = None
+
+    def route(self, method, pattern, handler):
+        self.routes.append((method, re.compile(f"^{pattern}$"), handler))
+
+    def dispatch(self, method, path, body, headers):
+        for route_method, pattern, handler in self.routes:
+            if route_method != method:
+                continue
+            m = pattern.match(path)
+            if m:
+                return handler(m, body, headers)
+        return 404, {"error": "not found"}
+
+    def start(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self, method):
+                path, _, query = self.path.partition('?')
+                body = dict(parse_qsl(query)) if query else None
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    try:
+                        body = json.loads(self.rfile.read(length))
+                    except ValueError:
+                        return self._send(400, {"error": "invalid json"})
+                try:
+                    result = api.dispatch(method, path, body, self.headers)
+                except Exception as e:
+                    logger.error(f"Local API {method} {self.path} failed: {e}")
+                    result = (500, {"error": str(e)})
+                self._send(*result)
+
+            def _send(self, status, payload, headers=None):
+                data = b"" if payload is None else (payload if isinstance(payload, bytes) else json.dumps(payload).encode('utf-8'))
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self): self._handle('GET')
+            def do_POST(self): self._handle('POST')
+
+            def log_message(self, format, *args):
+                pass   # the proxy already logs every request
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="local-api", daemon=True).start()
+        logger.info(f"Local API listening on http://{self.host}:{self.port}")
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
@@ -0,0 +1,139 @@
+import re
+import numpy as np
+from math import lgamma
+
+# Market picks and probabilities derived from a predicted scoreline (predictz, windrawwin, vitibet)
+# or from expected goals. Picks always follow the source's scoreline; only the probabilities come
+# from two independent Poisson distributions, computed for all matches of a parse in one batch.
+
+MAX_GOALS = 10            # per side; P(> 10 goals) is negligible for football scorelines
+# A Poisson's most likely count is floor(lambda), so a predicted k goals is read as lambda = k + 0.5
+SCORE_OFFSET = 0.5
+OU_LINES = {"OU15": 1.5, "OU25": 2.5, "OU35": 3.5}
+DERIVED_MARKETS = ["1X2", "DC", "BTTS", *OU_LINES, "CS"]
+PROB_SOURCE = "poisson"
+
+SCORE_RE = re.compile(r'(\d+)-(\d+)')
+
+_GOALS = np.arange(MAX_GOALS + 1)
+_LOG_FACTORIAL = np.array([lgamma(k + 1) for k in _GOALS])
+_TOTALS = _GOALS[:, None] + _GOALS[None, :]
+
+
+def parse_score(text):
+    # "2-1" / "home win 2-1" -> (2, 1), else None
+    m = SCORE_RE.search(text or "")
+    return (int(m.group(1)), int(m.group(2))) if m else None
+
+
+def score_pick(market, h_score, a_score):
+    # Pick implied by the predicted scoreline itself. None for a draw's double chance:
+    # both 1X and X2 cover it, fill_probabilities takes the likelier one.
+    if market == "1X2":
+        return "1" if h_score > a_score else "2" if h_score < a_score else "X"
+    if market == "DC":
+        return "1X" if h_score > a_score else "X2" if h_score < a_score else None
+    if market == "BTTS":
+        return "Yes" if h_score > 0 and a_score > 0 else "No"
+    if market in OU_LINES:
+        return "OVER" if (h_score + a_score) > OU_LINES[market] else "UNDER"
+    if market == "CS":
+        return f"{h_score}-{a_score}"
+    return None
+
+
+def derive_from_score(h_score, a_score):
+    # The picks the scoreline sources used to infer inline
+    return {market: {"pred": score_pick(market, h_score, a_score)} for market in ("BTTS", "OU25", "1X2")}
+
+
+def score_grid(lam_home, lam_away):
+    # [n, MAX_GOALS + 1, MAX_GOALS + 1] joint scoreline probabilities, home goals on axis 1
+    lam_home = np.maximum(np.asarray(lam_home, dtype=np.float64), 1e-6)[:, None]
+    lam_away = np.maximum(np.asarray(lam_away, dtype=np.float64), 1e-6)[:, None]
+    pmf_home = np.exp(_GOALS * np.log(lam_home) - lam_home - _LOG_FACTORIAL)
+    pmf_away = np.exp(_GOALS * np.log(lam_away) - lam_away - _LOG_FACTORIAL)
+    grid = pmf_home[:, :, None] * pmf_away[:, None, :]
+    # Renormalise the mass cut off above MAX_GOALS
+    return grid / grid.sum(axis=(1, 2), keepdims=True)
+
+
+def poisson_markets(lam_home, lam_away):
+    return market_probabilities(score_grid(lam_home, lam_away))
+
+
+def market_probabilities(grid):
+    # {market: {outcome: probability array[n]}} plus "CS": (most likely scorelines, probabilities)
+    home = np.tril(grid, -1).sum(axis=(1, 2))
+    draw = np.trace(grid, axis1=1, axis2=2)
+    away = np.triu(grid, 1).sum(axis=(1, 2))
+    btts = grid[:, 1:, 1:].sum(axis=(1, 2))
+    out = {
+        "1X2": {"1": home, "X": draw, "2": away},
+        "DC": {"1X": home + draw, "X2": draw + away, "12": home + away},
+        "BTTS": {"Yes": btts, "No": 1 - btts},
+    }
+    for market, line in OU_LINES.items():
+        over = (grid * (_TOTALS > line)).sum(axis=(1, 2))
+        out[market] = {"OVER": over, "UNDER": 1 - over}
+    flat = grid.reshape(len(grid), -1)
+    best = flat.argmax(axis=1)
+    out["CS"] = ([f"{i // (MAX_GOALS + 1)}-{i % (MAX_GOALS + 1)}" for i in best], flat[np.arange(len(flat)), best])
+    return out
+
+
+def _percent(p):
+    return str(int(round(float(p) * 100)))
+
+
+def _outcome(market, pred):
+    # Source pick -> outcome label of poisson_markets, None when it can't be mapped
+    pred = (pred or "").strip()
+    if market == "BTTS":
+        return "Yes" if pred.lower() in ("yes", "1", "kg var") else "No" if pred.lower() in ("no", "0", "kg yok") else None
+    if market in OU_LINES:
+        return "OVER" if pred.upper().startswith("O") else "UNDER" if pred.upper().startswith("U") else None
+    if market in ("1X2", "DC"):
+        return pred.upper() if pred.upper() in ("1", "X", "2", "1X", "X2", "12") else None
+    if market == "CS":
+        return pred if parse_score(pred) else None
+    return None
+
+
+def fill_probabilities(predictions):
+    # Adds the full derived market set to every prediction carrying a "score", and fills prob on
+    # its existing picks where the source left it empty or "0". Filled entries get prob_src.
+    scored = [(m, parse_score(m.get("score"))) for m in predictions]
+    scored = [(m, s) for m, s in scored if s is not None and max(s) <= MAX_GOALS]
+    if not scored:
+        return 0
+    scores = np.array([s for _, s in scored])
+    grid = score_grid(scores[:, 0] + SCORE_OFFSET, scores[:, 1] + SCORE_OFFSET)
+    probs = market_probabilities(grid)
+    filled = 0
+    for i, (m, (h_score, a_score)) in enumerate(scored):
+        markets = m.setdefault("markets", {})
+        for market in DERIVED_MARKETS:
+            entry = markets.get(market)
+            if entry is None:
+                pred = score_pick(market, h_score, a_score)
+                if pred is None:
+                    # Draw tip: the double chance side the model rates higher
+                    pred = "1X" if probs["DC"]["1X"][i] >= probs["DC"]["X2"][i] else "X2"
+            else:
+                pred = _outcome(market, entry.get("pred"))
+                if pred is None:
+                    continue
+            if market == "CS":
+                h, a = parse_score(pred)
+                p = grid[i, h, a] if max(h, a) <= MAX_GOALS else 0
+            else:
+                p = probs[market][pred][i]
+            if entry is None:
+                markets[market] = {"pred": pred, "prob": _percent(p), "prob_src": PROB_SOURCE}
+                filled += 1
+            elif not entry.get("prob") or entry.get("prob") == "0":
+                entry["prob"] = _percent(p)
+                entry["prob_src"] = PROB_SOURCE
+                filled += 1
+    return filled
@@ -0,0 +1,41 @@
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+
+FINGERPRINTS_FILE = "server/fingerprints.json"
+
+
+def fingerprint_rows(rows, version=""):
+    # Hash of the extracted rows only (the prediction table), so ads, scripts and
+    # tracking tokens elsewhere on the page don't count as a change. The parser version is
+    # mixed in: after a parser change the same rows must be parsed again, not skipped.
+    blob = json.dumps(rows, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(f"{version}:{blob}".encode("utf-8")).hexdigest()
+
+
+class FingerprintStore:
+    def __init__(self, path=FINGERPRINTS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.data = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.data = json.load(f)
+            except Exception as e:
+                print(f"[FINGERPRINT] Could not load {path}: {e}")
+
+    def get(self, site):
+        with self._lock:
+            return (self.data.get(site) or {}).get("hash")
+
+    def set(self, site, fingerprint):
+        with self._lock:
+            self.data[site] = {"hash": fingerprint, "updated": datetime.now().isoformat()}
+            try:
+                with open(self.path, 'w', encoding='utf-8') as f:
+                    json.dump(self.data, f, indent=2)
+            except Exception as e:
+                print(f"[FINGERPRINT] Could not save {self.path}: {e}")
@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import threading
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+READY_STATS_FILE = "server/readiness_stats.json"
+
+DEFAULT_DEADLINE = 30   # seconds, used until a site has enough history
+MIN_DEADLINE = 6
+HISTORY_SIZE = 20       # ready times kept per site
+MIN_SAMPLES = 5         # samples needed before the deadline adapts
+POLL_INTERVAL = 0.25
+
+
+# --- Readiness conditions (callables for WebDriverWait) ---
+
+def document_complete():
+    def check(driver):
+        return driver.execute_script("return document.readyState;") == "complete"
+    return check
+
+def selector_present(selector, min_count=1):
+    def check(driver):
+        return driver.execute_script("return document.querySelectorAll(arguments[0]).length;", selector) >= min_count
+    return check
+
+def row_count_stable(selector, settle=1.5, min_count=1):
+    # Ready once at least min_count rows exist and the count stopped growing for `settle` seconds
+    state = {"count": -1, "since": 0}
+
+    def check(driver):
+        count = driver.execute_script("return document.querySelectorAll(arguments[0]).length;", selector)
+        now = time.time()
+        if count != state["count"]:
+            state["count"] = count
+            state["since"] = now
+            return False
+        return count >= min_count and now - state["since"] >= settle
+    return check
+
+def datatables_ready(table_selector):
+    script = """
+        var sel = arguments[0];
+        var $ = window.jQuery;
+        if (!$ || !$.fn || !$.fn.dataTable) return false;
+        return $.fn.dataTable.isDataTable(sel) && $(sel + ' tbody tr').length > 0;
+    """
+    def check(driver):
+        return bool(driver.execute_script(script, table_selector))
+    return check
+
+def all_of(*conditions):
+    def check(driver):
+        # Evaluate every condition so stateful ones (row_count_stable) keep sampling
+        results = [cond(driver) for cond in conditions]
+        return all(results)
+    return check
+
+def any_of(*conditions):
+    def check(driver):
+        return any(cond(driver) for cond in conditions)
+    return check
+
+
+# --- Per-site ready-time history and adaptive deadlines ---
+
+class ReadinessTracker:
+    def __init__(self, path=READY_STATS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.stats = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.stats = json.load(f)
+            except Exception as e:
+                print(f"[READY] Could not load {path}: {e}")
+
+    def deadline(self, key, default=DEFAULT_DEADLINE):
+        with self._lock:
+            entry = self.stats.get(key, {})
+        samples = entry.get("samples", [])
+        # A recent timeout means the page got slower: go back to the full deadline
+        if len(samples) < MIN_SAMPLES or any(not s["ready"] for s in samples[-3:]):
+            return default
+        slowest = max(s["seconds"] for s in samples)
+        return max(MIN_DEADLINE, min(default, slowest * 2))
+
+    def record(self, key, seconds, ready):
+        with self._lock:
+            entry = self.stats.setdefault(key, {"samples": []})
+            entry["samples"] = (entry["samples"] + [{"seconds": round(seconds, 2), "ready": ready}])[-HISTORY_SIZE:]
+            entry["last"] = round(seconds, 2)
+            entry["updated"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+            try:
+                with open(self.path, 'w', encoding='utf-8') as f:
+                    json.dump(self.stats, f, indent=2)
+            except Exception as e:
+                print(f"[READY] Could not save {self.path}: {e}")
+
+    def wait(self, driver, key, condition, default=DEFAULT_DEADLINE):
+        # Block until `condition` holds or the (adaptive) deadline passes; returns True when ready
+        deadline = self.deadline(key, default)
+        started = time.time()
+        try:
+            WebDriverWait(driver, deadline, poll_frequency=POLL_INTERVAL,
+                          ignored_exceptions=(WebDriverException,)).until(condition)
+            ready = True
+        except TimeoutException:
+            ready = False
+        elapsed = time.time() - started
+        self.record(key, elapsed, ready)
+        if ready:
+            print(f"[READY] {key}: ready after {elapsed:.1f}s")
+        else:
+            print(f"[READY] {key}: not ready after {deadline:.0f}s deadline, parsing what is there")
+        return ready
@@ -0,0 +1,228 @@
+import os
+import re
+import glob
+import json
+import sqlite3
+import argparse
+import threading
+from datetime import datetime, timedelta
+
+# Append-only history of every scraped prediction, one SQLite file per kickoff month
+ARCHIVE_DIR = "server/archive"
+
+# Partitions older than this many months are deleted by maintain()
+RETENTION_MONTHS = int(os.environ.get("ARCHIVE_RETENTION_MONTHS", "12"))
+
+# Matches that kicked off more than this many days ago get their duplicate snapshots collapsed
+COMPACT_AFTER_DAYS = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS archive (
+    id INTEGER PRIMARY KEY,
+    kickoff INTEGER NOT NULL,       -- unix seconds, local time as published by the source
+    has_time INTEGER NOT NULL,      -- 0 when the source only gave a date
+    source TEXT NOT NULL,
+    market TEXT NOT NULL,
+    home TEXT,
+    away TEXT,
+    league TEXT,
+    match_key TEXT,
+    pred TEXT,
+    prob TEXT,
+    tip_count TEXT,
+    scraped_at INTEGER NOT NULL,
+    last_seen INTEGER NOT NULL,     -- same as scraped_at until compaction merges repeats
+    seen_count INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_archive_kickoff ON archive(kickoff);
+CREATE INDEX IF NOT EXISTS idx_archive_source_market ON archive(source, market, kickoff);
+"""
+KEY_INDEX = "CREATE INDEX IF NOT EXISTS idx_archive_key ON archive(match_key, kickoff)"
+
+COLUMNS = ["kickoff", "has_time", "source", "market", "home", "away", "league", "match_key", "pred", "prob",
+           "tip_count", "scraped_at", "last_seen", "seen_count"]
+
+
+def to_epoch(value):
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, str):
+        return int(datetime.fromisoformat(value).timestamp())
+    return int(value)
+
+def kickoff_of(m, scraped):
+    # Sources publish "DD.MM" + "HH:MM" without a year: pick the year that lands closest to the scrape
+    has_time = False
+    kickoff = scraped.replace(hour=0, minute=0, second=0, microsecond=0)
+    d = re.match(r"^(\d{1,2})\.(\d{1,2})", m.get("date") or "")
+    if d:
+        day, month = int(d.group(1)), int(d.group(2))
+        candidates = []
+        for year in (scraped.year - 1, scraped.year, scraped.year + 1):
+            try:
+                candidates.append(datetime(year, month, day))
+            except ValueError:
+                pass
+        if candidates:
+            kickoff = min(candidates, key=lambda c: abs(c - scraped))
+    t = re.match(r"^(\d{1,2}):(\d{2})", m.get("time") or "")
+    if t:
+        kickoff = kickoff.replace(hour=int(t.group(1)) % 24, minute=int(t.group(2)))
+        has_time = True
+    return kickoff, has_time
+
+def partition_name(dt):
+    return f"predictions_{dt.year:04d}_{dt.month:02d}.db"
+
+def months_between(start, end):
+    current = datetime(start.year, start.month, 1)
+    while current <= end:
+        yield current
+        current = datetime(current.year + (current.month == 12), current.month % 12 + 1, 1)
+
+
+class PredictionArchive:
+    def __init__(self, directory=ARCHIVE_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _connect(self, name, create=False):
+        path = os.path.join(self.directory, name)
+        if not create and not os.path.exists(path):
+            return None
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        if create:
+            conn.executescript(SCHEMA)
+        # Partitions written before match keys existed
+        if "match_key" not in [r[1] for r in conn.execute("PRAGMA table_info(archive)")]:
+            conn.execute("ALTER TABLE archive ADD COLUMN match_key TEXT")
+        conn.execute(KEY_INDEX)
+        return conn
+
+    def append(self, site, predictions, scraped_at=None):
+        scraped = scraped_at or datetime.now()
+        stamp = int(scraped.timestamp())
+        partitions = {}
+        for m in predictions:
+            kickoff, has_time = kickoff_of(m, scraped)
+            for market, data in (m.get("markets") or {}).items():
+                partitions.setdefault(partition_name(kickoff), []).append((
+                    int(kickoff.timestamp()), int(has_time), site, market, m.get("home"), m.get("away"),
+                    m.get("league"), m.get("match_key"), data.get("pred"), data.get("prob"), data.get("tip_count"), stamp, stamp, 1))
+
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        with self._lock:
+            for name, rows in partitions.items():
+                conn = self._connect(name, create=True)
+                try:
+                    with conn:
+                        conn.executemany(f"INSERT INTO archive ({', '.join(COLUMNS)}) VALUES ({placeholders})", rows)
+                finally:
+                    conn.close()
+        return sum(len(rows) for rows in partitions.values())
+
+    def query(self, start, end, source=None, market=None, match_key=None):
+        # All archived predictions for matches kicking off in [start, end]
+        start_ts, end_ts = to_epoch(start), to_epoch(end)
+        sql = f"SELECT {', '.join(COLUMNS)} FROM archive WHERE kickoff BETWEEN ? AND ?"
+        params = [start_ts, end_ts]
+        if source:
+            sql += " AND source = ?"
+            params.append(source)
+        if market:
+            sql += " AND market = ?"
+            params.append(market)
+        if match_key:
+            sql += " AND match_key = ?"
+            params.append(match_key)
+
+        out = []
+        for month in months_between(datetime.fromtimestamp(start_ts), datetime.fromtimestamp(end_ts)):
+            conn = self._connect(partition_name(month))
+            if conn is None:
+                continue
+            try:
+                out.extend(dict(zip(COLUMNS, row)) for row in conn.execute(sql, params))
+            finally:
+                conn.close()
+        out.sort(key=lambda r: (r["kickoff"], r["source"], r["market"]))
+        return out
+
+    def compact(self, older_than_days=COMPACT_AFTER_DAYS):
+        # Every run appends the same pick again while a match is upcoming. Once it has been played,
+        # keep one row per distinct pick with first/last seen times and how often it was seen.
+        cutoff = int((datetime.now() - timedelta(days=older_than_days)).timestamp())
+        removed = 0
+        with self._lock:
+            for path in sorted(glob.glob(os.path.join(self.directory, "predictions_*.db"))):
+                conn = self._connect(os.path.basename(path))
+                try:
+                    with conn:
+                        conn.execute("""
+                            CREATE TEMP TABLE merged AS
+                            SELECT MIN(id) AS keep_id, MAX(last_seen) AS last_seen, SUM(seen_count) AS seen_count, COUNT(*) AS n
+                            FROM archive WHERE kickoff < ?
+                            GROUP BY source, market, home, away, kickoff, pred, IFNULL(prob, ''), IFNULL(tip_count, '')
+                            HAVING n > 1
+                        """, (cutoff,))
+                        conn.execute("""
+                            UPDATE archive SET
+                                last_seen = (SELECT last_seen FROM merged WHERE keep_id = archive.id),
+                                seen_count = (SELECT seen_count FROM merged WHERE keep_id = archive.id)
+                            WHERE id IN (SELECT keep_id FROM merged)
+                        """)
+                        cur = conn.execute("""
+                            DELETE FROM archive WHERE kickoff < ? AND id NOT IN (
+                                SELECT MIN(id) FROM archive WHERE kickoff < ?
+                                GROUP BY source, market, home, away, kickoff, pred, IFNULL(prob, ''), IFNULL(tip_count, '')
+                            )
+                        """, (cutoff, cutoff))
+                        removed += cur.rowcount
+                        conn.execute("DROP TABLE merged")
+                    if cur.rowcount:
+                        conn.execute("VACUUM")
+                finally:
+                    conn.close()
+        return removed
+
+    def apply_retention(self, months=RETENTION_MONTHS):
+        now = datetime.now()
+        oldest = (now.year * 12 + now.month - 1) - months
+        dropped = []
+        with self._lock:
+            for path in glob.glob(os.path.join(self.directory, "predictions_*.db")):
+                m = re.search(r"predictions_(\d{4})_(\d{2})\.db$", path)
+                if m and int(m.group(1)) * 12 + int(m.group(2)) - 1 < oldest:
+                    for suffix in ("", "-wal", "-shm"):
+                        if os.path.exists(path + suffix):
+                            os.remove(path + suffix)
+                    dropped.append(os.path.basename(path))
+        return dropped
+
+    def maintain(self):
+        removed = self.compact()
+        dropped = self.apply_retention()
+        print(f"[ARCHIVE] Compacted {removed} duplicate rows, dropped {len(dropped)} expired partitions")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query or maintain the prediction archive")
+    sub = parser.add_subparsers(dest="command", required=True)
+    q = sub.add_parser("query", help="predictions for matches kicking off between START and END (ISO dates)")
+    q.add_argument("start")
+    q.add_argument("end")
+    q.add_argument("--source")
+    q.add_argument("--market")
+    q.add_argument("--match-key")
+    sub.add_parser("maintain", help="compact played matches and apply the retention policy")
+    args = parser.parse_args()
+
+    archive = PredictionArchive()
+    if args.command == "query":
+        for row in archive.query(args.start, args.end, source=args.source, market=args.market, match_key=args.match_key):
+            row["kickoff"] = datetime.fromtimestamp(row["kickoff"]).isoformat()
+            print(json.dumps(row, ensure_ascii=False))
+    else:
+        archive.maintain()
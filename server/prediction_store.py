@@ -0,0 +1,149 @@
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+DB_FILE = "server/consensus.db"
+
+# Bumped whenever stored prediction objects change shape; kept in PRAGMA user_version.
+# 1: "markets" dict instead of the old top-level "prediction"/"probability" fields
+# 2: home_id / away_id / match_key from team_index on every prediction
+# 3: consensus / consensus_votes tables (consensus_table.py) built from the stored predictions
+# 4: consensus votes rebuilt without model-derived (prob_src) probabilities
+SCHEMA_VERSION = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    position INTEGER NOT NULL,      -- order the site listed it in
+    match_date TEXT,
+    match_time TEXT,
+    home TEXT,
+    away TEXT,
+    league TEXT,
+    match_key TEXT,                 -- team_index.match_key(home, away)
+    data TEXT NOT NULL              -- full prediction object as JSON
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_source ON predictions(source, position);
+CREATE INDEX IF NOT EXISTS idx_predictions_date ON predictions(match_date, match_time);
+CREATE INDEX IF NOT EXISTS idx_predictions_match ON predictions(home, away);
+
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    updated_at TEXT,
+    count INTEGER,
+    checked_at TEXT                 -- last run that saw the site, changed or not
+);
+"""
+
+
+# SQLite (WAL) storage for consensus predictions. Each site is replaced in its own
+# transaction, so readers see either the old or the new list of a site, never half of it.
+class PredictionStore:
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+            columns = [r[1] for r in conn.execute("PRAGMA table_info(predictions)")]
+            if "match_key" not in columns:
+                conn.execute("ALTER TABLE predictions ADD COLUMN match_key TEXT")
+            if "checked_at" not in [r[1] for r in conn.execute("PRAGMA table_info(sources)")]:
+                conn.execute("ALTER TABLE sources ADD COLUMN checked_at TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_predictions_key ON predictions(match_key)")
+
+    def _conn(self):
+        # One connection per thread, run_all writes from worker threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def replace_site(self, site, predictions):
+        rows = [
+            (site, i, m.get("date"), m.get("time"), m.get("home"), m.get("away"), m.get("league"),
+             m.get("match_key"), json.dumps(m, ensure_ascii=False))
+            for i, m in enumerate(predictions)
+        ]
+        now = datetime.now().isoformat()
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM predictions WHERE source = ?", (site,))
+            conn.executemany(
+                "INSERT INTO predictions (source, position, match_date, match_time, home, away, league, match_key, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute(
+                "INSERT OR REPLACE INTO sources (source, updated_at, count, checked_at) VALUES (?, ?, ?, ?)",
+                (site, now, len(rows), now))
+
+    def touch_site(self, site):
+        # An unchanged run only moves checked_at; the predictions themselves are left alone
+        conn = self._conn()
+        with conn:
+            conn.execute("UPDATE sources SET checked_at = ? WHERE source = ?", (datetime.now().isoformat(), site))
+
+    def source_info(self, site):
+        row = self._conn().execute(
+            "SELECT updated_at, count, checked_at FROM sources WHERE source = ?", (site,)).fetchone()
+        return dict(zip(("updated_at", "count", "checked_at"), row)) if row else None
+
+    def schema_version(self):
+        return self._conn().execute("PRAGMA user_version").fetchone()[0]
+
+    def set_schema_version(self, version):
+        conn = self._conn()
+        with conn:
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+
+    def has_site(self, site):
+        return self._conn().execute("SELECT 1 FROM sources WHERE source = ?", (site,)).fetchone() is not None
+
+    def sources(self):
+        return [r[0] for r in self._conn().execute("SELECT source FROM sources ORDER BY rowid")]
+
+    def load_site(self, site):
+        cur = self._conn().execute("SELECT data FROM predictions WHERE source = ? ORDER BY position", (site,))
+        return [json.loads(r[0]) for r in cur]
+
+    def load_all(self):
+        return {site: self.load_site(site) for site in self.sources()}
+
+    def is_empty(self):
+        return self._conn().execute("SELECT 1 FROM sources LIMIT 1").fetchone() is None
+
+    def export_json(self, path):
+        # Write next to the target and rename, so the proxy never reads a half-written file
+        data = self.load_all()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, path)
+        return data
+
+
+class LazyResults(dict):
+    # site -> predictions, each site is read from the store the first time it is asked for
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+
+    def __missing__(self, site):
+        if not self.store.has_site(site):
+            raise KeyError(site)
+        predictions = self.store.load_site(site)
+        self[site] = predictions
+        return predictions
+
+    def __contains__(self, site):
+        return dict.__contains__(self, site) or self.store.has_site(site)
+
+    def get(self, site, default=None):
+        try:
+            return self[site]
+        except KeyError:
+            return default
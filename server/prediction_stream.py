@@ -0,0 +1,67 @@
+import os
+import json
+import time
+import threading
+from uuid import uuid4
+
+# Append-only NDJSON feed of a run: predictions show up here as soon as a site is parsed,
+# long before consensus_data.json is exported at the end of the run.
+STREAM_FILE = "server/consensus_stream.ndjson"
+
+# Matches per "match" batch; every record in a batch shares the batch number
+BATCH_SIZE = 50
+
+# Record types, in the order a reader sees them:
+#   run_start {sites}  ->  match {site, batch, match} ...  ->  site_done {site, count, changed}  ->  run_end {duration}
+# Every record carries run_id and seq (strictly increasing within a run), so a reader can tail
+# the file and resume from the last seq it saw.
+
+
+class PredictionStream:
+    def __init__(self, path=STREAM_FILE):
+        self.path = path
+        self.run_id = None
+        self.seq = 0
+        self._batches = {}
+        self._lock = threading.Lock()
+
+    def _write(self, records):
+        with self._lock:
+            if self.run_id is None:
+                self._open_run()
+            lines = []
+            for record in records:
+                self.seq += 1
+                lines.append(json.dumps(dict(record, run_id=self.run_id, seq=self.seq, ts=time.time()), ensure_ascii=False))
+            # One write per call keeps a batch contiguous even with several sites finishing at once
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+
+    def _open_run(self):
+        # The previous run is kept as .1 so a slow reader can still finish it
+        if os.path.exists(self.path):
+            os.replace(self.path, f"{self.path}.1")
+        # Unique even for runs started in the same second (daemon retry, CLI run next to the daemon)
+        self.run_id = uuid4().hex
+        self.seq = 0
+        self._batches = {}
+
+    def start_run(self, sites):
+        with self._lock:
+            self._open_run()
+        self._write([{"type": "run_start", "sites": list(sites)}])
+
+    def publish(self, site, predictions):
+        for i in range(0, len(predictions), BATCH_SIZE):
+            with self._lock:
+                batch = self._batches.get(site, 0) + 1
+                self._batches[site] = batch
+            self._write([{"type": "match", "site": site, "batch": batch, "match": m}
+                         for m in predictions[i:i + BATCH_SIZE]])
+
+    def site_done(self, site, count, changed):
+        self._write([{"type": "site_done", "site": site, "count": count, "changed": changed}])
+
+    def end_run(self, duration):
+        self._write([{"type": "run_end", "duration": round(duration, 1)}])
@@ -24,13 +24,37 @@ app.use((req, res, next) => {
 const SOFASCORE_FILE = path.join(__dirname, 'sofascore_live.json');
 const STATS_DIR = path.join(__dirname, 'stats');
 const REQUEST_QUEUE = path.join(__dirname, 'stats_request.json');
+// Local API of sofascore_scraper.py (in-memory cache + stats queue)
+const SCRAPER_API = process.env.SCRAPER_API || 'http://127.0.0.1:3002';
 
 if (!fs.existsSync(STATS_DIR)) fs.mkdirSync(STATS_DIR, { recursive: true });
 
 app.use('/data', express.static(__dirname));
 
+// Serve from the scraper's in-memory cache (ETag aware). Resolves false when the scraper
+// isn't reachable, the handlers below then fall back to the files in server/.
+async function fromScraper(req, res, apiPath) {
+    try {
+        const headers = {};
+        if (req.headers['if-none-match']) headers['If-None-Match'] = req.headers['if-none-match'];
+        const r = await fetch(`${SCRAPER_API}${apiPath}`, { headers, signal: AbortSignal.timeout(500) });
+        if (r.status === 404) return false; // scraper just (re)started, nothing cached yet
+        const etag = r.headers.get('etag');
+        if (etag) res.set('ETag', etag);
+        if (r.status === 304) {
+            res.status(304).end();
+            return true;
+        }
+        res.status(r.status).type('application/json').send(Buffer.from(await r.arrayBuffer()));
+        return true;
+    } catch (e) {
+        return false;
+    }
+}
+
 // 1. Live Events List
-app.get('/api/sofascore/live', (req, res) => {
+app.get('/api/sofascore/live', async (req, res) => {
+    if (await fromScraper(req, res, '/live')) return;
     if (fs.existsSync(SOFASCORE_FILE)) {
         const data = fs.readFileSync(SOFASCORE_FILE, 'utf8');
         return res.json(JSON.parse(data));
@@ -38,9 +62,24 @@ app.get('/api/sofascore/live', (req, res) => {
     res.status(404).json({ error: 'Data not found yet' });
 });
 
+// 1b. Live list deltas (score, status, minute, red cards) since a version, from the scraper's change feed
+app.get('/api/sofascore/live/changes', async (req, res) => {
+    const qs = new URLSearchParams({ since: req.query.since || '0' });
+    if (req.query.epoch) qs.set('epoch', req.query.epoch);
+    if (await fromScraper(req, res, `/live/changes?${qs}`)) return;
+    res.status(503).json({ error: 'Scraper not reachable', reset: true });
+});
+
+// 1c. Pressure / xG / velocity for every tracked live match, computed in the scraper (live_metrics.py)
+app.get('/api/sofascore/live/metrics', async (req, res) => {
+    if (await fromScraper(req, res, '/live/metrics')) return;
+    res.status(503).json({ error: 'Scraper not reachable' });
+});
+
 // 2. Match Details (with freshness check)
-app.get('/api/sofascore/event/:id', (req, res) => {
+app.get('/api/sofascore/event/:id', async (req, res) => {
     const id = req.params.id;
+    if (/^\d+$/.test(id) && await fromScraper(req, res, `/event/${id}`)) return;
     const filePath = path.join(STATS_DIR, `${id}_detail.json`);
 
     if (fs.existsSync(filePath)) {
@@ -60,8 +99,9 @@ app.get('/api/sofascore/event/:id', (req, res) => {
 });
 
 // 3. Match Statistics (with freshness check)
-app.get('/api/sofascore/event/:id/statistics', (req, res) => {
+app.get('/api/sofascore/event/:id/statistics', async (req, res) => {
     const id = req.params.id;
+    if (/^\d+$/.test(id) && await fromScraper(req, res, `/event/${id}/statistics`)) return;
     const filePath = path.join(STATS_DIR, `${id}_stats.json`);
 
     if (fs.existsSync(filePath)) {
@@ -81,7 +121,20 @@ app.get('/api/sofascore/event/:id/statistics', (req, res) => {
     res.status(202).json({ status: 'queued', message: 'Stats stale or missing' });
 });
 
+// The scraper's local API wakes its capture loop immediately; the file queue is the fallback
+// for when the scraper is (re)starting and the API isn't up yet.
 function queueRequest(id) {
+    fetch(`${SCRAPER_API}/queue`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ ids: [id] }),
+        signal: AbortSignal.timeout(1000)
+    })
+        .then(r => { if (!r.ok) throw new Error(`HTTP ${r.status}`); })
+        .catch(() => queueRequestFile(id));
+}
+
+function queueRequestFile(id) {
     let queue = { ids: [] };
     if (fs.existsSync(REQUEST_QUEUE)) {
         try {
@@ -109,13 +162,20 @@ function startScraper() {
 }
 
 // --- CONSENSUS API ---
+// consensus_data.json is exported from the scraper's SQLite store once per run (atomic rename),
+// so the parsed copy stays valid until the file's mtime changes.
+let consensusCache = { mtimeMs: 0, data: null };
+
 app.get('/api/consensus', (req, res) => {
     const filePath = path.join(__dirname, 'consensus_data.json');
     if (fs.existsSync(filePath)) {
         try {
             console.log('[PROXY] Consensus request received');
-            const data = JSON.parse(fs.readFileSync(filePath, 'utf8'));
-            res.json(data);
+            const { mtimeMs } = fs.statSync(filePath);
+            if (!consensusCache.data || consensusCache.mtimeMs !== mtimeMs) {
+                consensusCache = { mtimeMs, data: JSON.parse(fs.readFileSync(filePath, 'utf8')) };
+            }
+            res.json(consensusCache.data);
         } catch (e) {
             res.status(500).json({ error: "Consensus parse error" });
         }
@@ -124,20 +184,80 @@ app.get('/api/consensus', (req, res) => {
     }
 });
 
+// Merged per-match/per-market consensus rows, maintained incrementally by the scraper after each site
+let summaryCache = { mtimeMs: 0, data: null };
+
+app.get('/api/consensus/summary', (req, res) => {
+    const filePath = path.join(__dirname, 'consensus_summary.json');
+    if (!fs.existsSync(filePath)) return res.json({});
+    try {
+        const { mtimeMs } = fs.statSync(filePath);
+        if (!summaryCache.data || summaryCache.mtimeMs !== mtimeMs) {
+            summaryCache = { mtimeMs, data: JSON.parse(fs.readFileSync(filePath, 'utf8')) };
+        }
+        const market = req.query.market;
+        res.json(market ? { [market]: summaryCache.data[market] || [] } : summaryCache.data);
+    } catch (e) {
+        res.status(500).json({ error: "Consensus summary parse error" });
+    }
+});
+
+// Records of the current consensus run (NDJSON written by prediction_stream.py).
+// ?run_id=...&since=SEQ returns only newer records; a different run_id means "start over".
+app.get('/api/consensus/stream', (req, res) => {
+    const filePath = path.join(__dirname, 'consensus_stream.ndjson');
+    if (!fs.existsSync(filePath)) return res.json({ run_id: null, records: [] });
+    try {
+        const records = fs.readFileSync(filePath, 'utf8').split('\n').filter(Boolean)
+            .flatMap(line => { try { return [JSON.parse(line)]; } catch (e) { return []; } }); // last line may still be half-written
+        const runId = records.length ? records[0].run_id : null;
+        const since = req.query.run_id === runId ? parseInt(req.query.since || '0') : 0;
+        res.json({ run_id: runId, records: records.filter(r => r.seq > since) });
+    } catch (e) {
+        res.status(500).json({ error: "Consensus stream parse error" });
+    }
+});
+
+// Team alias table the scraper applies to match_key; the dashboard applies the same one to fixture names
+app.get('/api/consensus/aliases', (req, res) => {
+    const filePath = path.join(__dirname, 'team_aliases.json');
+    if (!fs.existsSync(filePath)) return res.json({});
+    try {
+        res.json(JSON.parse(fs.readFileSync(filePath, 'utf8')));
+    } catch (e) {
+        res.status(500).json({ error: "Team aliases parse error" });
+    }
+});
+
+// Consensus daemon schedule: last success, duration and next run per source
+app.get('/api/consensus/status', (req, res) => {
+    const filePath = path.join(__dirname, 'consensus_status.json');
+    if (!fs.existsSync(filePath)) return res.status(503).json({ error: 'Consensus daemon not started yet' });
+    try {
+        res.json(JSON.parse(fs.readFileSync(filePath, 'utf8')));
+    } catch (e) {
+        res.status(500).json({ error: "Consensus status parse error" });
+    }
+});
+
 app.listen(PORT, () => {
     console.log(`[PROXY SERVER] Running on http://localhost:${PORT}`);
     startScraper();
     startConsensusScraper();
 });
 
+let consensusDaemon = null;
+
+// consensus_daemon.py schedules the consensus sources itself (per-site cadence, no overlapping runs);
+// it is started once and restarted if it exits. Exit code 3: another daemon already holds the lock.
 function startConsensusScraper() {
-    console.log('[PROXY] Initializing Consensus Scraper...');
-    const spawnScraper = () => {
-        const pythonProcess = spawn('python', [path.join(__dirname, 'consensus_scraper.py')]);
-        pythonProcess.stdout.on('data', (data) => console.log(`[CONSENSUS_STDOUT] ${data}`));
-        pythonProcess.stderr.on('data', (data) => console.error(`[CONSENSUS_STDERR] ${data}`));
-    };
-
-    spawnScraper(); // Run once at start
-    setInterval(spawnScraper, 4 * 60 * 60 * 1000); // Re-run every 4 hours
+    console.log('[PROXY] Starting Consensus Daemon...');
+    consensusDaemon = spawn('python', ['-u', path.join(__dirname, 'consensus_daemon.py')]);
+    consensusDaemon.stdout.on('data', (data) => console.log(`[CONSENSUS_STDOUT] ${data}`));
+    consensusDaemon.stderr.on('data', (data) => console.error(`[CONSENSUS_STDERR] ${data}`));
+    consensusDaemon.on('close', (code) => {
+        const delay = code === 3 ? 60000 : 5000;
+        console.log(`[PROXY] Consensus daemon exited with code ${code}. Restarting in ${delay / 1000}s...`);
+        setTimeout(startConsensusScraper, delay);
+    });
 }
@@ -0,0 +1,54 @@
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Latest SofaScore payloads kept in the capture process, served to proxy.js over local_api
+CACHE_TTL = 60            # seconds, same freshness the proxy used to check on file mtimes
+CACHE_MAX_ENTRIES = 500   # least recently used entries are dropped past this
+
+
+class CacheEntry:
+    __slots__ = ("body", "etag", "stored_at", "error")
+
+    def __init__(self, body, etag, stored_at, error):
+        self.body = body            # serialized JSON bytes, encoded once at capture time
+        self.etag = etag
+        self.stored_at = stored_at
+        self.error = error          # SofaScore answered with an error marker
+
+    def age(self):
+        return time.time() - self.stored_at
+
+
+class ResponseCache:
+    def __init__(self, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, key, data, stored_at=None):
+        body = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        entry = CacheEntry(body, '"%s"' % hashlib.sha1(body).hexdigest()[:16], stored_at or time.time(),
+                           isinstance(data, dict) and "error" in data)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def fresh(self, entry):
+        return entry is not None and entry.age() < self.ttl
+
+    def __len__(self):
+        return len(self._entries)
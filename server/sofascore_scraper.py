@@ -2,9 +2,19 @@ import time
 import json
 import os
 import logging
+import numpy as np
 import undetected_chromedriver as uc
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
+from stats_queue import StatsQueue
+from local_api import LocalApi
+from cdp_capture import CdpCapture, debugger_address
+from batch_fetch import BATCH_MARKER, TokenBucket, batch_fetch
+from response_cache import ResponseCache
+from event_store import EventStore
+from live_feed import LiveFeed
+from live_scheduler import LiveScheduler
+from stats_table import StatsTable, flatten
+from stats_series import SeriesStore
+from live_metrics import LiveMetrics
 
 # Centralized Logging
 logging.basicConfig(
@@ -21,10 +31,13 @@ logger = logging.getLogger(__name__)
 DATA_FILE = 'server/sofascore_live.json'
 NETWORK_LOG_FILE = 'server/network_log.txt'
 STATS_DIR = 'server/stats'
+API_BASE = 'https://www.sofascore.com/api/v1'
 
-# Configure performance logging
-caps = DesiredCapabilities.CHROME
-caps['goog:loggingPrefs'] = {'performance': 'ALL'}
+# Targeted detail/statistics fetches: requests per second, burst, parallel fetches in the page
+FETCH_RATE = float(os.environ.get('SOFASCORE_FETCH_RATE', '4'))
+FETCH_BURST = int(os.environ.get('SOFASCORE_FETCH_BURST', '8'))
+FETCH_CONCURRENCY = int(os.environ.get('SOFASCORE_FETCH_CONCURRENCY', '4'))
+BATCH_MAX_MATCHES = 25
 
 def get_scraper():
     options = uc.ChromeOptions()
@@ -34,119 +47,258 @@ def get_scraper():
     options.add_argument('--disable-gpu')
     
     logger.info("Launching undetected-chromedriver...")
-    driver = uc.Chrome(options=options, desired_capabilities=caps)
+    # No performance logging: responses arrive as CDP events (cdp_capture.py)
+    driver = uc.Chrome(options=options)
     return driver
 
+class CaptureState:
+    # Shared by the CDP capture thread, the batched fetches and the local API
+    def __init__(self):
+        self.queue = StatsQueue()
+        self.cache = ResponseCache()
+        self.events = EventStore()
+        self.feed = LiveFeed()
+        self.scheduler = LiveScheduler()
+        self.table = StatsTable()
+        self.series = SeriesStore()
+        self.metrics = LiveMetrics()
+
+def start_local_api(state):
+    # proxy.js reads live data and posts stats requests here; files are only its fallback
+    api = LocalApi()
+    queue, cache, events, feed = state.queue, state.cache, state.events, state.feed
+
+    def cached(key, match_id=None, serve_errors=True):
+        def handler(m, body, headers):
+            entry = cache.get(key.format(*m.groups()))
+            if entry is None and match_id is not None:
+                # Not captured since this process started: warm the cache from the event store
+                stored = events.get(m.group(match_id), key.split(':')[0])
+                if stored is not None:
+                    entry = cache.put(key.format(*m.groups()), stored[0], stored_at=stored[1])
+            if match_id is not None:
+                if not cache.fresh(entry) or (entry.error and not serve_errors):
+                    # Stale/missing: refresh in this process, the client polls again as it did on 202 before
+                    queue.push([m.group(match_id)])
+                    return 202, {"status": "queued", "message": "Stale or missing"}
+            elif entry is None:
+                return 404, {"error": "Data not found yet"}
+            cache_headers = {"ETag": entry.etag, "X-Cache-Age": str(int(entry.age()))}
+            if headers.get('If-None-Match') == entry.etag:
+                return 304, None, cache_headers
+            return 200, entry.body, cache_headers
+        return handler
+
+    def series_range(m, query, headers):
+        # Snapshots captured between ?since= and ?until= (unix seconds), oldest first
+        query = query or {}
+        result = state.series.query(m.group(1),
+                                    float(query['since']) if query.get('since') else None,
+                                    float(query['until']) if query.get('until') else None)
+        if result is None:
+            return 404, {"error": "No statistics captured for this match"}
+        return 200, result
+
+    def stats_columns(m, query, headers):
+        # ?keys=expectedGoals,shotsOnGoal&period=ALL -> one [home, away] pair per key for every tracked match
+        query = query or {}
+        keys = [k for k in (query.get('keys') or '').split(',') if k]
+        period = query.get('period', 'ALL')
+        try:
+            ids, values = state.table.select(keys, period)
+        except KeyError as e:
+            return 400, {"error": f"Unknown statistic {e}"}
+        return 200, {"keys": keys, "period": period, "matches": {
+            match_id: [[None if np.isnan(v) else float(v) for v in pair] for pair in row]
+            for match_id, row in zip(ids, values)}}
+
+    api.route('GET', '/live', cached("live"))
+    api.route('GET', '/live/metrics', cached("metrics"))
+    api.route('GET', '/live/changes', lambda m, query, headers: (200, feed.since(
+        int((query or {}).get('since', 0)),
+        int(query['epoch']) if (query or {}).get('epoch') else None)))
+    # Same rules as the proxy's file handlers: error markers count as data for statistics, not for details
+    api.route('GET', r'/event/(\d+)', cached("detail:{}", match_id=1, serve_errors=False))
+    api.route('GET', r'/event/(\d+)/statistics', cached("stats:{}", match_id=1))
+    api.route('GET', r'/event/(\d+)/series', series_range)
+    api.route('GET', '/live/stats', stats_columns)
+    api.route('POST', '/queue', lambda m, body, headers: (200, {
+        "queued": queue.push((body or {}).get('ids', [])),
+        "pending": queue.pending()
+    }))
+    api.route('GET', '/health', lambda m, body, headers: (200, {"ok": True, "pending": queue.pending(), "cached": len(cache), "stored": len(events)}))
+    try:
+        api.start()
+    except OSError as e:
+        logger.error(f"Local API unavailable ({e}), proxy will fall back to the file queue")
+    return api
+
+def classify(request_url):
+    # (type_label, match_id) for SofaScore API responses we keep, else None
+    if "api/v1" not in request_url or "sofascore" not in request_url:
+        return None
+    if "sport/football/events/live" in request_url:
+        return "LIVE_LIST", None
+    path = request_url.split('?', 1)[0]
+    if path.endswith("/statistics"):
+        return "STATS", path.split('/')[-2]
+    if "/event/" in path:
+        match_id = path.split('/')[-1]
+        if match_id.isdigit():
+            return "DETAIL", match_id
+    return None
+
+def write_json_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def handle_response(request_url, body, state):
+    type_label, match_id = classify(request_url)
+    if type_label == "LIVE_LIST":
+        if not state.feed.changed_body(body):
+            state.scheduler.record_unchanged()
+            return   # byte-identical list, nothing to diff or write
+    json_data = json.loads(body)
+    if type_label == "LIVE_LIST" and "error" in json_data:
+        # Not an empty live list: keep the last good one in the cache, feed, stats table and file
+        logger.warning("API Error for LIVE_LIST, keeping the last captured list.")
+        return
+    if "error" in json_data:
+        logger.warning(f"API Error for {match_id or 'N/A'} ({type_label}), saving empty marker.")
+        json_data = {"error": "No data available", "items": []}
+
+    if type_label == "LIVE_LIST":
+        state.cache.put("live", json_data)
+        deltas = state.feed.update(json_data)
+        # Finished matches leave the stats table (and the metrics) with the list they dropped out of
+        if state.table.retain(state.feed.states):
+            state.metrics.mark_dirty()
+        publish_metrics(state)
+        state.scheduler.record_live(json_data, deltas)
+        # The file is only the proxy's fallback: rewrite it when an event actually changed
+        if deltas or not os.path.exists(DATA_FILE):
+            write_json_atomic(DATA_FILE, json_data)
+            logger.info(f"Captured LIVE_LIST -> {DATA_FILE} ({len(deltas)} changes, version {state.feed.version})")
+        return
+
+    kind = type_label.lower()
+    state.cache.put(f"{kind}:{match_id}", json_data)
+    state.events.put(match_id, kind, json_data)
+    if "error" not in json_data:
+        logger.info(f"Captured {type_label} for {match_id} -> {state.events.path}")
+    # The statistics call is the last one issued per request
+    if type_label == "STATS":
+        state.queue.ack(match_id)
+        if "error" not in json_data:
+            # Flattened once here; the table and the series both work on the numeric row
+            row = flatten(json_data)
+            state.table.put(match_id, row)
+            # Minute from the latest live list; None for matches that aren't in it
+            minute = (state.feed.states.get(match_id) or {}).get("minute")
+            state.series.append(match_id, row, minute)
+            state.metrics.mark_dirty()
+
+def publish_metrics(state):
+    # Pressure / xG / velocity for all tracked matches, recomputed once per batch of new snapshots
+    if state.metrics.dirty:
+        payload = state.metrics.refresh(state.table, state.series)
+        state.cache.put("metrics", payload)
+
+def fetch_targeted(driver, ids, bucket, state):
+    # Detail + statistics for every queued match from inside the page, paced by the token bucket
+    # instead of fixed sleeps; bodies come straight back from execute_async_script
+    started = time.time()
+    urls = []
+    for match_id in ids:
+        urls += [f"{API_BASE}/event/{match_id}", f"{API_BASE}/event/{match_id}/statistics"]
+    results = batch_fetch(driver, urls, bucket, concurrency=FETCH_CONCURRENCY)
+    failed = 0
+    for r in results:
+        if not r.get("body"):
+            # Network error: not acked, the lease runs out and the match is fetched again
+            failed += 1
+            continue
+        try:
+            handle_response(r["url"], r["body"], state)
+        except Exception as e:
+            failed += 1
+            logger.warning(f"Bad response for {r['url']} (HTTP {r.get('status')}): {e}")
+    state.scheduler.record_batch(len(urls), failed)
+    logger.info(f"Targeted fetch: {len(ids)} matches, {len(urls)} requests in {time.time() - started:.1f}s ({failed} failed)")
+
 def capture_sofascore():
     driver = None
+    capture = None
+    state = CaptureState()
+    state.events.migrate_legacy_files(STATS_DIR)
+    state.events.expire()
+    api = start_local_api(state)
     try:
         driver = get_scraper()
+        # Responses are handled as soon as Chrome finishes loading them, not on the next poll
+        capture = CdpCapture(
+            debugger_address(driver),
+            # Batched fetches hand their bodies back directly, no need to capture them twice
+            url_filter=lambda url: BATCH_MARKER not in url and classify(url) is not None,
+            on_response=lambda url, body: handle_response(url, body, state)
+        )
+        capture.start()
+        driver.set_script_timeout(60)
+        bucket = TokenBucket(FETCH_RATE, FETCH_BURST)
         url = "https://www.sofascore.com/"
         print(f"[SCRAPER] Navigating to {url}...")
         driver.get(url)
         time.sleep(15)
-        last_live_fetch = 0
-        last_page_refresh = time.time()
+        state.scheduler.refreshed(time.time())
+        last_expire = time.time()
 
         while True:
-            # Check for generic event fetch requests or specific detail requests
-            logs = driver.get_log('performance')
-            
-            for entry in logs:
-                try:
-                    message = json.loads(entry['message'])['message']
-                    method = message.get('method')
-                    
-                    if method == 'Network.responseReceived':
-                        params = message.get('params', {})
-                        response = params.get('response', {})
-                        request_url = response.get('url', '')
-                        
-                        # Use a broader match to capture EVERYTHING from SofaScore API
-                        if "api/v1" in request_url and "sofascore" in request_url:
-                            request_id = params['requestId']
-                            
-                            # Determine type of data
-                            if "sport/football/events/live" in request_url:
-                                type_label = "LIVE_LIST"
-                                target_path = DATA_FILE
-                            elif "/statistics" in request_url:
-                                type_label = "STATS"
-                                match_id = request_url.split('/')[-2]
-                                target_path = os.path.join(STATS_DIR, f"{match_id}_stats.json")
-                            elif "/event/" in request_url and "/statistics" not in request_url:
-                                type_label = "DETAIL"
-                                match_id = request_url.split('/')[-1]
-                                if not match_id.isdigit():
-                                    continue
-                                target_path = os.path.join(STATS_DIR, f"{match_id}_detail.json")
-                            else:
-                                continue
-
-                            current_match_id = match_id if 'match_id' in locals() else "N/A"
-                            try:
-                                response_body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
-                                body = response_body.get('body', '')
-                                if body:
-                                    json_data = json.loads(body)
-                                    if "error" not in json_data:
-                                        with open(target_path, 'w', encoding='utf-8') as f:
-                                            json.dump(json_data, f)
-                                        if type_label == "LIVE_LIST":
-                                            logger.info(f"Captured LIVE_LIST -> {target_path}")
-                                        else:
-                                            logger.info(f"Captured {type_label} for {match_id} -> {target_path}")
-                                    else:
-                                        logger.warning(f"API Error for {current_match_id} ({type_label}), saving empty marker.")
-                                        with open(target_path, 'w', encoding='utf-8') as f:
-                                            json.dump({"error": "No data available", "items": []}, f)
-                            except Exception as e:
-                                continue
-
-                except Exception:
-                    continue
-            
-            if time.time() - last_live_fetch > 30:
-                logger.info(f"Periodic manual fetch for LIVE_LIST (TS: {int(time.time())})")
-                cb = int(time.time())
-                driver.execute_script(f"fetch('https://www.sofascore.com/api/v1/sport/football/events/live?cache_buster={cb}');")
-                last_live_fetch = time.time()
-
-            if time.time() - last_page_refresh > 600:
-                logger.info("Safety net: Refreshing page...")
+            if not capture.alive():
+                # Exit so proxy.js restarts the scraper with a fresh browser
+                raise RuntimeError(f"CDP capture died: {capture.error}")
+
+            now = time.time()
+            if state.scheduler.live_due(now):
+                logger.info(f"Manual fetch for LIVE_LIST (interval {state.scheduler.interval:.0f}s, {state.scheduler.live_count} live)")
+                driver.execute_script(f"fetch('{API_BASE}/sport/football/events/live?cache_buster={int(now)}');")
+                state.scheduler.live_fetched(now)
+
+            if time.time() - last_expire > 600:
+                state.events.expire()
+                last_expire = time.time()
+
+            reason = state.scheduler.refresh_reason(time.time())
+            if reason:
+                logger.warning(f"Refreshing page: {reason}")
                 driver.refresh()
                 time.sleep(10)
-                last_page_refresh = time.time()
-
-            request_queue = 'server/stats_request.json'
-            if os.path.exists(request_queue):
-                try:
-                    with open(request_queue, 'r') as rq:
-                        req_data = json.load(rq)
-                    os.remove(request_queue)
-                    
-                    ids = req_data.get('ids', [])
-                    if ids:
-                        logger.info(f"Processing queue: {len(ids)} matches")
-                        for match_id in ids:
-                            logger.info(f"Targeted fetch for Match ID: {match_id}")
-                            # Add a small delay between fetches to avoid being flagged
-                            driver.execute_script(f"fetch('https://www.sofascore.com/api/v1/event/{match_id}');")
-                            time.sleep(0.5)
-                            driver.execute_script(f"fetch('https://www.sofascore.com/api/v1/event/{match_id}/statistics');")
-                            time.sleep(1.0)
-                except Exception as e:
-                    logger.error(f"Queue processing error: {e}")
-
-            time.sleep(2)
+                state.scheduler.refreshed(time.time())
+
+            try:
+                # Cleared before leasing: a push landing after this point sets it again and cuts the wait short
+                state.queue.wakeup.clear()
+                state.queue.drain_legacy_file()
+                ids = state.queue.lease(limit=BATCH_MAX_MATCHES)
+                if ids:
+                    fetch_targeted(driver, ids, bucket, state)
+                publish_metrics(state)
+            except Exception as e:
+                logger.error(f"Queue processing error: {e}")
+
+            # Sleep until the next poll is due, or until the proxy queues a request
+            state.queue.wakeup.wait(state.scheduler.tick(time.time()))
             
     except Exception as e:
         logger.error(f"FATAL ERROR in capture loop: {e}", exc_info=True)
     finally:
+        if capture:
+            capture.stop()
+        api.stop()
         if driver:
             driver.quit()
 
 if __name__ == "__main__":
     if not os.path.exists('server'): os.makedirs('server')
-    if not os.path.exists(STATS_DIR): os.makedirs(STATS_DIR)
     capture_sofascore()
@@ -0,0 +1,92 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DB = 'server/stats_queue.db'
+
+# Legacy file queue written by older proxies; still drained so nothing queued there is lost
+LEGACY_QUEUE_FILE = 'server/stats_request.json'
+
+# A leased job that isn't acked within this many seconds is handed out again
+LEASE_SECONDS = 30
+
+# Give up on a match after this many deliveries (SofaScore has no data for it)
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    match_id TEXT PRIMARY KEY,      -- one pending job per match, re-queueing is a no-op
+    enqueued_at REAL NOT NULL,
+    lease_until REAL NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+# Stats request queue between proxy.js and the SofaScore scraper. At-least-once: a job stays
+# in the table until the scraper acks it (its data was captured) or it runs out of attempts.
+class StatsQueue:
+    def __init__(self, path=QUEUE_DB):
+        self.path = path
+        self.wakeup = threading.Event()   # set on push so the capture loop doesn't sit out its sleep
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def push(self, ids):
+        ids = [str(i) for i in ids if str(i).isdigit()]
+        if not ids:
+            return 0
+        conn = self._conn()
+        with conn:
+            cur = conn.executemany("INSERT OR IGNORE INTO jobs (match_id, enqueued_at) VALUES (?, ?)",
+                                   [(i, time.time()) for i in ids])
+        self.wakeup.set()
+        return cur.rowcount
+
+    def lease(self, limit=10):
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM jobs WHERE attempts >= ? AND lease_until < ?", (MAX_ATTEMPTS, now))
+            ids = [r[0] for r in conn.execute(
+                "SELECT match_id FROM jobs WHERE lease_until < ? ORDER BY enqueued_at LIMIT ?", (now, limit))]
+            conn.executemany("UPDATE jobs SET lease_until = ?, attempts = attempts + 1 WHERE match_id = ?",
+                             [(now + LEASE_SECONDS, i) for i in ids])
+        return ids
+
+    def ack(self, match_id):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM jobs WHERE match_id = ?", (str(match_id),))
+
+    def pending(self):
+        return self._conn().execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def drain_legacy_file(self, path=LEGACY_QUEUE_FILE):
+        # Rename first: whatever the proxy writes after this lands in a new file instead of being lost
+        if not os.path.exists(path):
+            return 0
+        claimed = f"{path}.{os.getpid()}"
+        try:
+            os.replace(path, claimed)
+            with open(claimed, 'r') as f:
+                ids = json.load(f).get('ids', [])
+            os.remove(claimed)
+        except Exception as e:
+            logger.error(f"Legacy queue file error: {e}")
+            return 0
+        return self.push(ids)
@@ -0,0 +1,130 @@
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+from stats_table import SIDES, column_index
+
+# Per-match time series of the live statistics the analysis modules use.
+# (column, SofaScore statisticsItems key); each key gives a _home and an _away column.
+SERIES_STATS = [
+    ("shots_on_goal", "shotsOnGoal"),
+    ("corners", "cornerKicks"),
+    ("xg", "expectedGoals"),
+    ("possession", "ballPossession"),
+    ("big_chances", "bigChanceCreated"),
+]
+SERIES_COLUMNS = [f"{name}_{side}" for name, _ in SERIES_STATS for side in SIDES]
+SERIES_INDEX = [column_index(key, "ALL", side) for _, key in SERIES_STATS for side in SIDES]
+
+SERIES_CAPACITY = 256        # snapshots kept per match, oldest overwritten first
+SERIES_MAX_MATCHES = 500     # least recently updated matches are dropped past this
+
+
+def series_row(flat):
+    # SERIES_COLUMNS picked out of a stats_table.flatten() row (period ALL)
+    return flat[SERIES_INDEX]
+
+
+class StatsSeries:
+    # Fixed-size ring buffer: capture time, match minute and one float32 row per snapshot
+    def __init__(self, capacity=SERIES_CAPACITY):
+        self.ts = np.zeros(capacity, dtype=np.float64)
+        self.minute = np.full(capacity, np.nan, dtype=np.float32)
+        self.values = np.full((capacity, len(SERIES_COLUMNS)), np.nan, dtype=np.float32)
+        self.head = 0      # next slot to write
+        self.count = 0
+
+    def append(self, ts, minute, row):
+        # Unchanged snapshots add nothing: the previous point still describes that moment
+        if self.count and np.array_equal(self.values[self.head - 1], row, equal_nan=True):
+            return False
+        self.ts[self.head] = ts
+        self.minute[self.head] = np.nan if minute is None else minute
+        self.values[self.head] = row
+        self.head = (self.head + 1) % len(self.ts)
+        self.count = min(self.count + 1, len(self.ts))
+        return True
+
+    def _order(self):
+        # Slot indices, oldest first
+        start = (self.head - self.count) % len(self.ts)
+        return (start + np.arange(self.count)) % len(self.ts)
+
+    def range(self, since=None, until=None):
+        # (ts, minute, values) for snapshots captured in [since, until], oldest first
+        idx = self._order()
+        ts = self.ts[idx]
+        mask = np.ones(len(idx), dtype=bool)
+        if since is not None:
+            mask &= ts >= since
+        if until is not None:
+            mask &= ts <= until
+        idx = idx[mask]
+        return self.ts[idx], self.minute[idx], self.values[idx]
+
+    def latest(self):
+        if not self.count:
+            return None
+        return self.values[self.head - 1]
+
+    def at_or_before(self, ts):
+        # Last snapshot captured at or before ts (falls back to the oldest one we have)
+        if not self.count:
+            return None
+        idx = self._order()
+        pos = np.searchsorted(self.ts[idx], ts, side="right") - 1
+        return self.values[idx[max(pos, 0)]]
+
+
+class SeriesStore:
+    def __init__(self, capacity=SERIES_CAPACITY, max_matches=SERIES_MAX_MATCHES):
+        self.capacity = capacity
+        self.max_matches = max_matches
+        self.series = OrderedDict()
+        self._lock = threading.Lock()
+
+    def append(self, match_id, flat, minute=None, ts=None):
+        row = series_row(flat)
+        with self._lock:
+            series = self.series.get(match_id)
+            if series is None:
+                series = self.series[match_id] = StatsSeries(self.capacity)
+            self.series.move_to_end(match_id)
+            while len(self.series) > self.max_matches:
+                self.series.popitem(last=False)
+            return series.append(ts or time.time(), minute, row)
+
+    def get(self, match_id):
+        with self._lock:
+            return self.series.get(match_id)
+
+    def query(self, match_id, since=None, until=None):
+        # JSON-friendly range query for the local API
+        series = self.get(match_id)
+        if series is None:
+            return None
+        with self._lock:
+            ts, minute, values = series.range(since, until)
+        return {
+            "columns": SERIES_COLUMNS,
+            "ts": ts.tolist(),
+            "minute": [None if np.isnan(m) else float(m) for m in minute],
+            "values": [[None if np.isnan(v) else round(float(v), 3) for v in row] for row in values],
+        }
+
+    def window(self, match_ids, seconds, now=None):
+        # (latest[n, C], past[n, C], counts[n]): each match's newest snapshot and the one from
+        # `seconds` ago (or its oldest), gathered in one pass for vectorised trend calculations
+        now = now or time.time()
+        latest = np.full((len(match_ids), len(SERIES_COLUMNS)), np.nan, dtype=np.float32)
+        past = latest.copy()
+        counts = np.zeros(len(match_ids), dtype=np.int32)
+        with self._lock:
+            for i, match_id in enumerate(match_ids):
+                series = self.series.get(match_id)
+                if series is None or not series.count:
+                    continue
+                latest[i] = series.latest()
+                past[i] = series.at_or_before(now - seconds)
+                counts[i] = series.count
+        return latest, past, counts
@@ -0,0 +1,117 @@
+import time
+import threading
+import numpy as np
+
+# Columnar view of the SofaScore /statistics payloads of every tracked match.
+# Each payload is flattened once at capture time into one float32 row with a fixed
+# (period, key, side) column layout, so per-key calculations run over all matches at once.
+PERIODS = ("ALL", "1ST", "2ND")
+SIDES = ("home", "away")
+STAT_KEYS = [
+    # Match overview
+    "ballPossession", "expectedGoals", "bigChanceCreated", "totalShotsOnGoal", "goalkeeperSaves",
+    "cornerKicks", "fouls", "passes", "totalTackle", "freeKicks", "yellowCards", "redCards",
+    # Shots
+    "shotsOnGoal", "hitWoodwork", "shotsOffGoal", "blockedScoringAttempt",
+    "totalShotsInsideBox", "totalShotsOutsideBox",
+    # Attack
+    "bigChanceScored", "bigChanceMissed", "accurateThroughBall", "touchesInOppBox",
+    "fouledFinalThird", "offsides",
+    # Passes
+    "accuratePasses", "throwIns", "finalThirdEntries", "finalThirdPhaseStatistic",
+    "accurateLongBalls", "accurateCross",
+    # Duels
+    "duelWonPercent", "dispossessed", "groundDuelsPercentage", "aerialDuelsPercentage", "dribblesPercentage",
+    # Defending
+    "wonTacklePercent", "ballRecovery", "interceptionWon", "totalClearance",
+    "errorsLeadToShot", "errorsLeadToGoal",
+    # Goalkeeping
+    "diveSaves", "highClaims", "punches", "goalKicks", "goalsPrevented", "penaltySaves",
+]
+COLUMNS = [f"{period}:{key}:{side}" for period in PERIODS for key in STAT_KEYS for side in SIDES]
+COLUMN_INDEX = {(period, key, side): i for i, (period, key, side) in
+                enumerate((p, k, s) for p in PERIODS for k in STAT_KEYS for s in SIDES)}
+
+INITIAL_ROWS = 256   # grows by doubling past this
+
+
+def column_index(key, period="ALL", side="home"):
+    return COLUMN_INDEX[(period, key, side)]
+
+
+def flatten(stats):
+    # One row of COLUMNS from a /statistics payload; stats missing from it (or unknown keys) stay NaN.
+    # Only the numeric homeValue/awayValue are kept, the display strings ("69%") are dropped.
+    row = np.full(len(COLUMNS), np.nan, dtype=np.float32)
+    for period in stats.get("statistics") or []:
+        name = period.get("period")
+        if name not in PERIODS:
+            continue
+        for group in period.get("groups") or []:
+            for item in group.get("statisticsItems") or []:
+                i = COLUMN_INDEX.get((name, item.get("key"), "home"))
+                if i is None:
+                    continue
+                home, away = item.get("homeValue"), item.get("awayValue")
+                row[i] = np.nan if home is None else home
+                row[i + 1] = np.nan if away is None else away
+    return row
+
+
+class StatsTable:
+    def __init__(self, rows=INITIAL_ROWS):
+        self.values = np.full((rows, len(COLUMNS)), np.nan, dtype=np.float32)
+        self.updated_at = np.zeros(rows, dtype=np.float64)
+        self.rows = {}     # match_id -> row index
+        self.free = list(range(rows - 1, -1, -1))
+        self._lock = threading.Lock()
+
+    def _grow(self):
+        size = len(self.values)
+        self.values = np.vstack([self.values, np.full((size, len(COLUMNS)), np.nan, dtype=np.float32)])
+        self.updated_at = np.concatenate([self.updated_at, np.zeros(size)])
+        self.free = list(range(2 * size - 1, size - 1, -1))
+
+    def put(self, match_id, row, ts=None):
+        # row: output of flatten()
+        match_id = str(match_id)
+        with self._lock:
+            i = self.rows.get(match_id)
+            if i is None:
+                if not self.free:
+                    self._grow()
+                i = self.rows[match_id] = self.free.pop()
+            self.values[i] = row
+            self.updated_at[i] = ts or time.time()
+
+    def remove(self, match_id):
+        with self._lock:
+            i = self.rows.pop(str(match_id), None)
+            if i is not None:
+                self.values[i] = np.nan
+                self.updated_at[i] = 0
+                self.free.append(i)
+
+    def retain(self, match_ids):
+        # Drop every match not in match_ids (e.g. no longer in the live list); returns how many went
+        keep = {str(m) for m in match_ids}
+        with self._lock:
+            stale = [m for m in self.rows if m not in keep]
+        for match_id in stale:
+            self.remove(match_id)
+        return len(stale)
+
+    def select(self, keys, period="ALL", match_ids=None):
+        # (match_ids, values[n, len(keys), 2]) with home/away on the last axis; a copy, safe to use unlocked
+        cols = [column_index(key, period, side) for key in keys for side in SIDES]
+        with self._lock:
+            if match_ids is None:
+                ids = list(self.rows)
+            else:
+                ids = [str(m) for m in match_ids if str(m) in self.rows]
+            idx = np.fromiter((self.rows[m] for m in ids), dtype=np.intp, count=len(ids))
+            values = self.values[np.ix_(idx, cols)]
+        return ids, values.reshape(len(ids), len(keys), 2)
+
+    def __len__(self):
+        return len(self.rows)
@@ -0,0 +1,65 @@
+import os
+import re
+import json
+import unicodedata
+from functools import lru_cache
+
+# Extra spellings that survive the cleaning rules, as {"cleaned variant": "cleaned canonical"}.
+# proxy.js serves the same file to the dashboard (/api/consensus/aliases) for its keyed lookups.
+TEAM_ALIASES_FILE = "server/team_aliases.json"
+
+# Same steps, in the same order, as consensusAdapter._clean in src/backend, so keys computed here
+# line up with the ones the dashboard derives (consensusAdapter._teamId)
+CLEAN_RULES = [
+    (re.compile(r"\bmilano\b", re.ASCII), "milan"),
+    (re.compile(r"\blisboa\b", re.ASCII), "lisbon"),
+    (re.compile(r"\bpraha\b", re.ASCII), "prague"),
+    (re.compile(r"\bmadeira\b", re.ASCII), "nacional"),   # Specific alias for CD Nacional
+    (re.compile(r"\s+vs\s+"), " "),
+    (re.compile(r"\s+v\s+"), " "),
+    (re.compile(r"\s+-\s+"), " "),
+    # Noise words & common suffixes
+    (re.compile(r"\b(ac|fc|sc|cf|cd|ud|sd|rc|cp|fk|as|ssc|lfc|afc|rsc|youth|u20|u19|u23|b|reserve|reserves|lisbon|lisboa|madrid|london|praha|prague|calcio|vitoria|funchal|de|of)\b", re.ASCII), ""),
+    (re.compile(r"\b(manchester)\b", re.ASCII), "man"),
+    (re.compile(r"\b(united)\b", re.ASCII), "utd"),
+    (re.compile(r"\b(saint)\b", re.ASCII), "st"),
+    (re.compile(r"[^a-z0-9]"), ""),
+]
+ACCENTS = re.compile(r"[\u0300-\u036f]")
+
+def _load_aliases():
+    if not os.path.exists(TEAM_ALIASES_FILE):
+        return {}
+    try:
+        with open(TEAM_ALIASES_FILE, 'r', encoding='utf-8') as f:
+            return {clean_name(k): clean_name(v) for k, v in json.load(f).items()}
+    except Exception as e:
+        print(f"[TEAM_INDEX] Could not load {TEAM_ALIASES_FILE}: {e}")
+        return {}
+
+@lru_cache(maxsize=8192)
+def clean_name(name):
+    if not name:
+        return ""
+    s = ACCENTS.sub("", unicodedata.normalize("NFD", name.lower()))
+    for pattern, repl in CLEAN_RULES:
+        s = pattern.sub(repl, s)
+    return s
+
+ALIASES = _load_aliases()
+
+@lru_cache(maxsize=8192)
+def team_id(name):
+    cleaned = clean_name(name)
+    return ALIASES.get(cleaned, cleaned)
+
+def match_key(home, away):
+    return f"{team_id(home)}_{team_id(away)}"
+
+def index_predictions(predictions):
+    # Stamp canonical ids on every prediction so consumers join sources by key instead of fuzzy matching
+    for m in predictions:
+        m["home_id"] = team_id(m.get("home"))
+        m["away_id"] = team_id(m.get("away"))
+        m["match_key"] = f"{m['home_id']}_{m['away_id']}"
+    return predictions
@@ -0,0 +1,98 @@
+import sys
+import os
+import gzip
+import shutil
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+sys.path.append(os.path.join(os.getcwd(), 'server'))
+import http_fetch
+from consensus_scraper import CHANGED, UNCHANGED, ConsensusScraper
+
+# Local stand-in for the prediction sites: serves the recorded fixture pages
+# (gzip + keep-alive like the real servers) and a Cloudflare challenge for /blocked.
+FIXTURE_DIR = os.path.abspath("server/test_pages")
+# Predictions in each fixture page (see test_offline_parse.py)
+EXPECTED_PREDICTIONS = {"prosoccer": 3, "vitibet": 3, "zulubet": 3}
+CHALLENGE = b"<html><head><title>Just a moment...</title></head><body>cf-chl</body></html>"
+connections = set()
+
+class RecordedPages(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        connections.add(self.client_address)
+        site = self.path.strip("/")
+        path = os.path.join(FIXTURE_DIR, f"{site}.html")
+        if site == "blocked":
+            body = CHALLENGE
+        elif os.path.exists(path):
+            with open(path, 'rb') as f:
+                body = f.read()
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_response(200)
+            self.send_header("Content-Encoding", "gzip")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_http_fetch():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RecordedPages)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    # Every path the scraper writes is relative to server/ (store, archive, fingerprints, pages,
+    # summary, stream, fetch paths): run from a scratch directory so the real data is never touched
+    cwd = os.getcwd()
+    scratch = tempfile.mkdtemp(prefix="lbm_http_fetch_")
+    os.makedirs(os.path.join(scratch, "server"))
+    shutil.copy(os.path.join(cwd, "server", "team_aliases.json"), os.path.join(scratch, "server"))
+    os.chdir(scratch)
+    try:
+        scraper = ConsensusScraper()
+        urls = {site: source["url"] for site, source in http_fetch.HTTP_SOURCES.items()}
+        for site in http_fetch.HTTP_SOURCES:
+            http_fetch.HTTP_SOURCES[site]["url"] = f"{base}/{site}"
+            # Two rounds: the second one must reuse the pooled connection. scrape_http returns None
+            # only when it gives up on HTTP; an unchanged page (second round) is still a working fetch.
+            outcomes = [scraper.scrape_http(site)]
+            first = scraper.store.source_info(site)
+            outcomes.append(scraper.scrape_http(site))
+            info = scraper.store.source_info(site)
+            count = len(scraper.results.get(site, []))
+            ok = None not in outcomes and scraper.fetcher.paths[site]["path"] == "http"
+            print(f"{site.upper()}: HTTP path {'OK' if ok else 'FAILED'} ({' -> '.join(map(str, outcomes))}), {count} predictions")
+            assert ok, f"{site}: HTTP path failed"
+            assert outcomes == [CHANGED, UNCHANGED], f"{site}: {outcomes}"
+            assert count == EXPECTED_PREDICTIONS[site], f"{site}: {count} predictions"
+            # The unchanged round only stamps checked_at, the stored predictions are not rewritten
+            assert info["updated_at"] == first["updated_at"] and info["checked_at"] > first["checked_at"], info
+
+        http_fetch.HTTP_SOURCES["zulubet"]["url"] = f"{base}/blocked"
+        ok = scraper.scrape_http("zulubet")
+        print(f"CHALLENGE PAGE: {'fell back to browser' if not ok else 'WRONGLY ACCEPTED'} (remembered: {scraper.fetcher.paths['zulubet']['path']})")
+        assert ok is None and scraper.fetcher.paths["zulubet"]["path"] == "browser"
+        print(f"TCP connections opened: {len(connections)}")
+        assert len(connections) == 1, f"{len(connections)} connections, keep-alive not reused"
+        scraper.pool.close_all()
+    finally:
+        for site, url in urls.items():
+            http_fetch.HTTP_SOURCES[site]["url"] = url
+        os.chdir(cwd)
+        server.shutdown()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_http_fetch()
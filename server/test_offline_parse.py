@@ -0,0 +1,86 @@
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.getcwd(), 'server'))
+from consensus_scraper import SCRAPE_ORDER
+from site_parsers import parse_page
+
+# Trimmed copies of each site's markup (league headers, match rows and one row the parser
+# must skip). Refresh one from server/pages/<site>.html after a browser scrape when a site changes.
+FIXTURE_DIR = "server/test_pages"
+
+# site -> (rows extracted, [(home, away, league, {market: pred}, {field: value})])
+EXPECTED = {
+    "forebet": (4, [
+        ("Arsenal", "Chelsea", "England Premier League", {"1X2": "1"}, {"date": "18.10", "time": "14:00", "prob": "52"}),
+        ("Getafe", "Real Madrid", "Spain LaLiga", {"1X2": "2"}, {"date": "18.10", "time": "16:15", "prob": "58"}),
+        ("Inter", "Juventus", "Italy Serie A", {"1X2": "X"}, {"date": "19.10", "time": "20:45", "prob": "38"}),
+    ]),
+    "prosoccer": (4, [
+        ("Arsenal", "Chelsea", None, {"1X2": "1", "OU25": "OVER"}, {"time": "14:00"}),
+        ("Getafe", "Real Madrid", None, {"1X2": "2", "OU25": "UNDER"}, {"time": "16:15"}),
+        ("Inter", "Juventus", None, {"1X2": "1X", "OU25": "UNDER"}, {"time": "20:45"}),
+    ]),
+    "predictz": (4, [
+        ("Arsenal", "Chelsea", "England Premier League", {"1X2": "1", "BTTS": "Yes", "OU25": "OVER", "CS": "2-1"}, {"score": "2-1"}),
+        ("Everton", "Fulham", "England Premier League", {"1X2": "X", "BTTS": "Yes", "OU25": "UNDER", "CS": "1-1"}, {"score": "1-1"}),
+        ("Getafe", "Real Madrid", "Spain La Liga", {"1X2": "2", "BTTS": "No", "OU25": "UNDER", "DC": "X2"}, {"score": "0-2"}),
+    ]),
+    "windrawwin": (4, [
+        ("Arsenal", "Chelsea", "England Premier League", {"1X2": "1", "BTTS": "No", "OU25": "UNDER"}, {"time": "14:00", "score": "2-0"}),
+        ("Everton", "Fulham", "England Premier League", {"1X2": "X", "BTTS": "Yes", "OU25": "UNDER"}, {"time": "16:30", "score": "1-1"}),
+        ("Mainz", "Bayern Munich", "Germany Bundesliga", {"1X2": "2", "BTTS": "Yes", "OU25": "OVER"}, {"time": "17:30", "score": "1-3"}),
+    ]),
+    "statarea": (4, [
+        ("Arsenal", "Chelsea", None, {"1X2": "1"}, {"time": "14:00"}),
+        ("Getafe", "Real Madrid", None, {"1X2": "2"}, {"time": "16:15"}),
+        ("Inter", "Juventus", None, {"1X2": "X"}, {"time": "20:45"}),
+    ]),
+    "vitibet": (6, [
+        ("Arsenal", "Chelsea", "England Premier League", {"1X2": "1", "BTTS": "Yes", "OU25": "OVER"}, {"date": "18.10", "score": "2-1"}),
+        ("Everton", "Fulham", "England Premier League", {"1X2": "X", "BTTS": "Yes", "OU25": "UNDER"}, {"date": "18.10", "score": "1-1"}),
+        ("Getafe", "Real Madrid", "Spain Primera Division", {"1X2": "2", "BTTS": "No", "OU25": "UNDER"}, {"date": "18.10", "score": "0-2"}),
+    ]),
+    "zulubet": (5, [
+        ("Arsenal", "Chelsea", "England Premier League", {"1X2": "1"}, {"time": "14:00"}),
+        ("Getafe", "Real Madrid", "Spain LaLiga", {"1X2": "2"}, {"time": "16:15"}),
+        ("Inter", "Juventus", "Italy Serie A", {"1X2": "1X"}, {"time": "20:45"}),
+    ]),
+    "olbg": (4, [
+        ("Arsenal", "Chelsea", "England Premier League", {"1X2": "1"}, {"time": "14:00", "prob": "78", "tip_count": "52/67"}),
+        ("Getafe", "Real Madrid", "Spain La Liga", {"BTTS": "Yes"}, {"time": "16:15", "prob": "64", "tip_count": "25/39"}),
+        ("Inter", "Juventus", "Italy Serie A", {"OU25": "UNDER"}, {"time": "20:45", "prob": "59", "tip_count": "19/32"}),
+    ]),
+}
+
+def check_site(site):
+    with open(os.path.join(FIXTURE_DIR, f"{site}.html"), 'rb') as f:
+        html = f.read()
+    started = time.time()
+    row_count, fingerprint, predictions = parse_page(site, html)
+    elapsed = (time.time() - started) * 1000
+    print(f"{site.upper()}: {row_count} rows, {len(predictions)} predictions in {elapsed:.0f}ms (fingerprint {fingerprint[:10]})")
+
+    rows, matches = EXPECTED[site]
+    assert row_count == rows, f"{site}: {row_count} rows, expected {rows}"
+    assert len(predictions) == len(matches), f"{site}: {len(predictions)} predictions, expected {len(matches)}"
+    for m, (home, away, league, picks, fields) in zip(predictions, matches):
+        assert (m["home"], m["away"]) == (home, away), f"{site}: got {m['home']} vs {m['away']}"
+        assert m.get("league") == league, f"{site}: league {m.get('league')!r} for {home}"
+        for market, pred in picks.items():
+            assert m["markets"][market]["pred"] == pred, f"{site}: {market} {m['markets'].get(market)} for {home}"
+        main = next(iter(picks))
+        for name, value in fields.items():
+            got = m["markets"][main].get(name) if name in ("prob", "tip_count") else m.get(name)
+            assert got == value, f"{site}: {name} {got!r}, expected {value!r} for {home}"
+    # Unchanged rows hash the same, so the next run can skip the parse
+    assert parse_page(site, html, skip_fingerprint=fingerprint)[2] is None
+
+def test_offline_parse():
+    print(f"Parsing recorded pages from {FIXTURE_DIR} (no browser)...")
+    for site in SCRAPE_ORDER:
+        check_site(site)
+    print("All sites parsed as expected")
+
+if __name__ == "__main__":
+    test_offline_parse()
@@ -26,7 +26,7 @@ sudo npm install -g pm2
 
 # 5. Install Python Scraper Dependencies
 echo "🐍 Installing Python Dependencies..."
-pip3 install undetected-chromedriver selenium
+pip3 install undetected-chromedriver selenium lxml cssselect numpy websockets
 
 # 6. Verify Installations
 echo "✅ Verification:"
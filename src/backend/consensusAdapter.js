@@ -7,6 +7,7 @@ import { CONFIG } from '../config';
 export const consensusAdapter = {
     async fetchConsensus() {
         try {
+            if (!this._aliasesLoaded) await this.fetchAliases();
             const response = await fetch('http://localhost:3001/api/consensus');
             if (!response.ok) throw new Error('Consensus data unreachable');
             return await response.json();
@@ -16,8 +17,65 @@ export const consensusAdapter = {
         }
     },
 
+    // Cleaned names are memoised; the same few hundred team names come back on every refresh
+    _cleanCache: new Map(),
+
+    // server/team_aliases.json as cleaned variant -> cleaned canonical, like team_index.ALIASES
+    _aliases: new Map(),
+    _aliasesLoaded: false,
+
+    // Per-site lookup by match_key (stamped by the Python scraper), rebuilt when the site array changes
+    _keyIndex: new WeakMap(),
+
+    async fetchAliases() {
+        try {
+            const response = await fetch('http://localhost:3001/api/consensus/aliases');
+            if (!response.ok) throw new Error('Team aliases unreachable');
+            const aliases = await response.json();
+            this._aliases = new Map(Object.entries(aliases).map(([k, v]) => [this._clean(k), this._clean(v)]));
+            this._aliasesLoaded = true;
+        } catch (error) {
+            console.error('[CONSENSUS_ADAPTER] Aliases error:', error);
+        }
+    },
+
+    async fetchConsensusSummary() {
+        try {
+            const response = await fetch('http://localhost:3001/api/consensus/summary');
+            if (!response.ok) throw new Error('Consensus summary unreachable');
+            return await response.json();
+        } catch (error) {
+            console.error('[CONSENSUS_ADAPTER] Summary error:', error);
+            return null;
+        }
+    },
+
+    /**
+     * Rows pre-aggregated by the scraper (server/consensus_table.py), already sorted by agreement.
+     * Returns null when the summary has no such market so callers can fall back to getAllConsensusSummary.
+     */
+    fromSummary(summary, selectedMarket = '1X2') {
+        if (!summary || !Array.isArray(summary[selectedMarket])) return null;
+        const minProb = CONFIG.MODULAR_SYSTEM.ADVANCED_ANALYSIS.VALUE_DETECTION.MIN_CONSENSUS_PROB;
+        return summary[selectedMarket].map(m => ({
+            ...m,
+            isValue: parseInt(m.probabilities.forebet || 0) >= minProb || parseInt(m.probabilities.olbg || 0) >= minProb
+        }));
+    },
+
     _clean(name) {
         if (!name) return "";
+        let cleaned = this._cleanCache.get(name);
+        if (cleaned === undefined) {
+            if (this._cleanCache.size > 5000) this._cleanCache.clear();
+            cleaned = this._cleanUncached(name);
+            this._cleanCache.set(name, cleaned);
+        }
+        return cleaned;
+    },
+
+    // Keep in sync with server/team_index.py (CLEAN_RULES)
+    _cleanUncached(name) {
         return name.toLowerCase()
             .normalize("NFD").replace(/[\u0300-\u036f]/g, "") // Remove accents
             .replace(/\bmilano\b/g, 'milan')
@@ -52,6 +110,30 @@ export const consensusAdapter = {
         });
     },
 
+    // Same as team_index.team_id: cleaned name, then the alias table
+    _teamId(name) {
+        const cleaned = this._clean(name);
+        return this._aliases.has(cleaned) ? this._aliases.get(cleaned) : cleaned;
+    },
+
+    _matchKey(m) {
+        return m.match_key || `${this._teamId(m.home)}_${this._teamId(m.away)}`;
+    },
+
+    findMatchByKey(siteData, home, away) {
+        if (!Array.isArray(siteData)) return null;
+        let index = this._keyIndex.get(siteData);
+        if (!index) {
+            index = new Map();
+            siteData.forEach(p => {
+                const key = this._matchKey(p);
+                if (!index.has(key)) index.set(key, p);
+            });
+            this._keyIndex.set(siteData, index);
+        }
+        return index.get(`${this._teamId(home)}_${this._teamId(away)}`) || null;
+    },
+
     getConsensusSummary(globalData, fixture, market = '1X2') {
         const report = {
             totalSources: 0,
@@ -60,14 +142,17 @@ export const consensusAdapter = {
         };
 
         Object.entries(globalData).forEach(([site, matches]) => {
-            const match = this.findMatchInConsensus(matches, `${fixture.homeTeam} ${fixture.awayTeam}`);
+            // Exact key first, fuzzy scan only for names the canonical key doesn't cover
+            const match = this.findMatchByKey(matches, fixture.homeTeam, fixture.awayTeam)
+                || this.findMatchInConsensus(matches, `${fixture.homeTeam} ${fixture.awayTeam}`);
             if (match && match.markets && match.markets[market]) {
                 const mData = match.markets[market];
                 report.totalSources++;
                 report.signals.push({
                     site,
                     prediction: mData.pred,
-                    prob: mData.prob
+                    prob: mData.prob,
+                    probSrc: mData.prob_src // set when the probability is model-derived (markets.py), not published by the site
                 });
 
                 // Track consensus agreement
@@ -99,9 +184,7 @@ export const consensusAdapter = {
                 const mData = m.markets[selectedMarket];
                 const home = m.home.trim();
                 const away = m.away.trim();
-                const homeClean = this._clean(home);
-                const awayClean = this._clean(away);
-                const key = `${homeClean}_${awayClean}`;
+                const key = this._matchKey(m);
 
                 if (!matchMap[key]) {
                     let cleanLeague = m.league || 'Others';
@@ -146,7 +229,8 @@ export const consensusAdapter = {
                 }
 
                 matchMap[key].predictions[site] = normalizedPred;
-                if (mData.prob && mData.prob !== "0") {
+                // Model-derived probabilities (prob_src) are not the source's own
+                if (mData.prob && mData.prob !== "0" && !mData.prob_src) {
                     matchMap[key].probabilities[site] = mData.prob;
                 }
 
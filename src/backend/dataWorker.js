@@ -40,6 +40,7 @@ class DataWorker {
         this.selectedMatchId = null;
         this.dataSource = CONFIG.DATA.DATA_SOURCE;
         this.consensusData = {};
+        this.consensusSummary = null;
         this.consensusTimer = 0;
     }
 
@@ -77,6 +78,8 @@ class DataWorker {
             console.log('[DATA_WORKER] Fetching global consensus data...');
             const data = await consensusAdapter.fetchConsensus();
             if (data) this.consensusData = data;
+            const summary = await consensusAdapter.fetchConsensusSummary();
+            if (summary) this.consensusSummary = summary;
             await new Promise(resolve => setTimeout(resolve, 2 * 60 * 1000)); // Every 2 mins
         }
     }
@@ -51,6 +51,7 @@ export const Dashboard = ({ user, onLogout }) => {
     });
     const [view, setView] = useState('DASHBOARD'); // 'DASHBOARD', 'ADMIN', 'RADAR'
     const [consensusData, setConsensusData] = useState({});
+    const [consensusSummary, setConsensusSummary] = useState(null);
 
     // Radar Filters State
     const [radarFilters, setRadarFilters] = useState({
@@ -64,8 +65,9 @@ export const Dashboard = ({ user, onLogout }) => {
     const [selectedMarket, setSelectedMarket] = useState('1X2');
 
     const radarMatches = React.useMemo(() => {
-        return consensusAdapter.getAllConsensusSummary(consensusData, selectedMarket);
-    }, [consensusData, selectedMarket]);
+        return consensusAdapter.fromSummary(consensusSummary, selectedMarket)
+            || consensusAdapter.getAllConsensusSummary(consensusData, selectedMarket);
+    }, [consensusSummary, consensusData, selectedMarket]);
 
     const filteredRadarMatches = React.useMemo(() => {
         return radarMatches.filter(m => {
@@ -114,6 +116,7 @@ export const Dashboard = ({ user, onLogout }) => {
             const freshConsensus = { ...dataWorker.consensusData };
             console.log('[DASHBOARD] Syncing Consensus Data:', Object.entries(freshConsensus).map(([k, v]) => `${k}:${v?.length}`).join(', '));
             setConsensusData(freshConsensus);
+            setConsensusSummary(dataWorker.consensusSummary);
 
             const currentFixtures = dataWorker.fixtures;
             if (currentFixtures.length === 0) {